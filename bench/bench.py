@@ -0,0 +1,379 @@
+"""
+Offline benchmarks for the scan pipeline.
+
+    python bench/bench.py                       # run and compare to bench/baseline.json
+    python bench/bench.py --sizes 10000,1000000 # synthetic posting counts
+    python bench/bench.py --update-baseline     # store this run as the new baseline
+    python bench/bench.py --check               # exit 1 if anything regressed past --tolerance
+    python bench/bench.py --record              # refresh bench/fixtures from the live boards
+    python bench/bench.py --serve 8765          # just serve the fixtures, for main.py runs against them
+
+Search and detail pages (and Adzuna API responses) come from bench/fixtures
+and are served by a local HTTP server, so sources run end to end without
+touching the live boards. Large
+inputs (dedupe, near-duplicates, scoring, report rendering) come from a seeded
+synthetic generator. Times are the best of --repeat runs.
+"""
+import argparse, json, os, platform, random, re, sys, threading, time
+from datetime import timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+BASELINE = os.path.join(HERE, "baseline.json")
+sys.path.insert(0, os.path.dirname(HERE))
+
+# Keep the benchmark hermetic: no cache/state/archive side effects, no host spacing
+for k, v in {"HTTP_CACHE": "0", "STATE": "0", "ENRICH": "0", "ARCHIVE": "0", "BREAKER": "0",
+             "HTTP_HOST_MIN_INTERVAL_S": "0", "SEEK_MAX_RESULTS": "100000", "INDEED_MAX_RESULTS": "100000",
+             "ADZUNA_MIN_INTERVAL_S": "0", "ADZUNA_MAX_RESULTS": "100000", "STORAGE_BACKEND": "local"}.items():
+    os.environ.setdefault(k, v)
+
+import main  # noqa: E402
+
+FIXTURE_ROUTES = {
+    "/seek": "seek_search.html",
+    "/indeed": "indeed_search.html",
+    "/direct": "seek_direct.html",
+    "/detail/seek": "seek_detail.html",
+    "/detail/indeed": "indeed_detail.html",
+    "/adzuna": "adzuna_search.json",  # /adzuna/<page>
+}
+LIVE_SOURCES = {  # --record: fixture -> live URL
+    "seek_search.html": main.SEEK_SEARCH_URL,
+    "indeed_search.html": main.INDEED_SEARCH_URL,
+}
+if main.SOURCE_REGISTRY["adzuna"].configured():
+    LIVE_SOURCES["adzuna_search.json"] = main.SOURCE_REGISTRY["adzuna"].page_urls()[0]
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+# ----------------------- FIXTURE SERVER --------------------------------------
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        name = FIXTURE_ROUTES.get(path) or FIXTURE_ROUTES.get(path.rsplit("/", 1)[0])
+        if not name:
+            self.send_error(404)
+            return
+        body = fixture(name).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json" if name.endswith(".json") else "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_fixture_server(port=0):
+    srv = ThreadingHTTPServer(("127.0.0.1", port), _FixtureHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+# ----------------------- SYNTHETIC DATA --------------------------------------
+
+_SENIORITY = ["Head of", "Director of", "Senior Manager,", "Lead", "Principal", "Manager,", "GM", "Chief"]
+_FUNCTION = ["Data", "Analytics", "Data & Analytics", "Data Engineering", "Data Platform", "Insights",
+             "Data Governance", "BI", "Data Science", "Data Strategy"]
+_AREA = ["Retail Banking", "Wealth", "Payments", "Customer", "Risk", "Finance", "Marketing", "Operations", "Supply Chain",
+         "Digital", "Product", "Claims", "Pricing", "Fraud", "Health", "Education", "Transport", "Energy", "Media",
+         "Group", "Enterprise", "Platform", "Growth", "Lending", "Markets", "Treasury", "People", "Procurement",
+         "Property", "Infrastructure", "Networks", "Cyber", "Commercial", "Consumer", "Institutional", "Mobility"]
+_SUFFIX = ["", "", "", " - Contract", " (Azure)", " | Fabric", " - 6 month contract", " - Sydney CBD", " (Power BI)"]
+_COMPANIES = ["Westpac Group", "Hays", "Robert Walters", "NSW Government", "Canva", "Atlassian", "Transport for NSW",
+              "Michael Page", "Commonwealth Bank", "Randstad", "Qantas", "IAG", "Seek Listing", "Indeed Listing"]
+_BODIES = ["", "", "Lead our azure and fabric platform in financial services.",
+           "Government agency seeks a powerbi lead; day rate contract.",
+           "Own the analytics roadmap for a retail business.",
+           "Healthcare data function, permanent role, hybrid."]
+
+def synthetic_rows(n, seed=11):
+    """
+    n postings shaped like scraper output: ~5% exact repeats (dedupe), ~10%
+    cross-posts of an earlier title on another board (near-duplicates), dates
+    spread over three weeks so some fall outside the window.
+    """
+    rng = random.Random(seed)
+    now = main.UTC_NOW
+    rows = []
+    for i in range(n):
+        roll = rng.random()
+        if rows and roll < 0.05:
+            rows.append(dict(rows[rng.randrange(len(rows))]))
+            continue
+        if rows and roll < 0.15:
+            src = rows[rng.randrange(len(rows))]
+            title = src["Role"] + rng.choice([" - Sydney", " (Hybrid)", ""])
+            company = src["Company/Agency"]
+        else:
+            title = f"{rng.choice(_SENIORITY)} {rng.choice(_FUNCTION)}, {rng.choice(_AREA)}{rng.choice(_SUFFIX)}"
+            company = rng.choice(_COMPANIES)
+        board = rng.choice(["seek", "indeed"])
+        url = (f"https://www.seek.com.au/job/{70000000 + i}" if board == "seek"
+               else f"https://au.indeed.com/viewjob?jk={i:016x}")
+        r = main.row(title, company, url, now - timedelta(hours=rng.randrange(0, 24 * 21)),
+                     "Permanent", "Active", "edge-case/other", "Sydney search", None)
+        r["_body"] = rng.choice(_BODIES)
+        r["_source"] = board
+        rows.append(r)
+    return rows
+
+def inflate_cards(html, factor):
+    """A search page with every <article> card repeated `factor` times: a stand-in for very long result pages."""
+    cards = re.findall(r"<article\b.*?</article>", html, flags=re.S)
+    if not cards:
+        return html
+    first, last = html.index(cards[0]), html.rindex(cards[-1]) + len(cards[-1])
+    return html[:first] + "\n".join(cards * factor) + html[last:]
+
+class SnapshotPage:
+    """Just enough of a Playwright page for _extract_cards_snapshot: content() returns a fixed DOM."""
+    def __init__(self, html):
+        self._html = html
+
+    def content(self):
+        return self._html
+
+# ----------------------- HARNESS ---------------------------------------------
+
+def best_of(fn, repeat):
+    """(best seconds, last result) over `repeat` calls."""
+    best, out = float("inf"), None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+class Results:
+    def __init__(self):
+        self.items = {}
+
+    def add(self, name, secs, n=None, unit="items"):
+        entry = {"secs": round(secs, 5)}
+        if n is not None:
+            entry.update({"n": n, "unit": unit, "per_s": round(n / secs, 1) if secs > 0 else None})
+        self.items[name] = entry
+        rate = f"  {entry['per_s']:>12,.1f} {unit}/s" if n else ""
+        print(f"  {name:<42} {secs * 1000:>10.2f} ms{rate}", flush=True)
+
+    def skip(self, name, reason):
+        self.items[name] = {"skipped": reason}
+        print(f"  {name:<42} skipped: {reason}", flush=True)
+
+def bench_parsers(res, repeat, pages):
+    print("parsers", flush=True)
+    seek, indeed = fixture("seek_search.html"), fixture("indeed_search.html")
+    for name, fn, html in (("parse.seek_page", main.parse_seek_page, seek),
+                           ("parse.indeed_page", main.parse_indeed_page, indeed)):
+        secs, rows = best_of(lambda: [r for _ in range(pages) for r in fn(html)], repeat)
+        res.add(name, secs / pages, 1, "pages")
+        res.items[name]["rows_per_page"] = len(rows) // pages
+    big = inflate_cards(seek, 20)
+    secs, rows = best_of(lambda: list(main.parse_seek_page(big)), repeat)
+    res.add("parse.seek_page_large", secs, len(rows), "rows")
+    # anchor selection alone on the large page, per backend, against the original full-tree bs4 parse
+    secs, found = best_of(lambda: main.BeautifulSoup(big, "html.parser").select("a[href*='/job/']"), repeat)
+    res.add("anchors_large.bs4_full_tree", secs, len(found), "anchors")
+    for name, cls in main.HTML_BACKENDS.items():
+        try:
+            backend = cls()
+        except ImportError as e:
+            res.skip(f"anchors_large.{name}", str(e).splitlines()[0][:80])
+            continue
+        secs, (found, _) = best_of(lambda: main.select_anchors(big, ("/job/",), backend=backend), repeat)
+        res.add(f"anchors_large.{name}", secs, len(found), "anchors")
+    for name, page in (("parse.seek_detail", "seek_detail.html"), ("parse.indeed_detail", "indeed_detail.html")):
+        html = fixture(page)
+        secs, _ = best_of(lambda: [main.parse_job_detail(html) for _ in range(pages)], repeat)
+        res.add(name, secs / pages, 1, "pages")
+
+def bench_scrapers(res, repeat, base):
+    print("scrapers (local fixture server)", flush=True)
+    main.SEEK_SEARCH_URL, main.INDEED_SEARCH_URL = f"{base}/seek?q=x", f"{base}/indeed?q=x"
+    main.ADZUNA_API_URL, main.ADZUNA_APP_ID, main.ADZUNA_APP_KEY = f"{base}/adzuna", "bench", "bench"
+    since, main.SINCE = main.SINCE, main.UTC_NOW - timedelta(days=3650)  # fixture dates never age out
+    try:
+        for key in ("seek", "indeed", "adzuna"):
+            src = main.SOURCE_REGISTRY[key]
+            secs, rows = best_of(lambda: main.collect_source(src), repeat)
+            res.add(f"scrape.{key}", secs, len(rows), "rows")
+            res.items[f"scrape.{key}"]["pages"] = len(src.page_urls())
+    finally:
+        main.SINCE = since
+
+def bench_seek_direct(res, repeat, base):
+    print("seek_direct extraction", flush=True)
+    html = fixture("seek_direct.html")
+    sel = "article[data-automation='normalJob']"
+    secs, cards = best_of(lambda: main._extract_cards_snapshot(SnapshotPage(html), sel, main.SEEK_DIRECT_MAX_CARDS),
+                          repeat)
+    res.add("seek_direct.snapshot_parse", secs, len(cards), "cards")
+
+    try:
+        with main.BROWSER_POOL.page() as page:
+            page.goto(f"{base}/direct", wait_until="domcontentloaded", timeout=30000)
+            for mode, fn in (("evaluate", main._extract_cards_evaluate), ("snapshot", main._extract_cards_snapshot),
+                             ("locator", main._extract_cards_locator)):
+                secs, cards = best_of(lambda: fn(page, sel, main.SEEK_DIRECT_MAX_CARDS), 1 if mode == "locator" else repeat)
+                res.add(f"seek_direct.browser_{mode}", secs, len(cards), "cards")
+    except Exception as e:
+        res.skip("seek_direct.browser", f"{type(e).__name__}: {str(e).splitlines()[0][:120] if str(e) else ''}")
+    finally:
+        main.close_browser_pool()
+
+def synthetic_date_strings(n, seed=5):
+    """Date strings in the shapes the boards emit, with the repetition real runs have."""
+    rng = random.Random(seed)
+    shapes = [lambda: f"{rng.randint(1, 30)}d ago", lambda: f"Listed {rng.randint(1, 30)} days ago",
+              lambda: "30+ days ago", lambda: "Just posted", lambda: f"{rng.randint(1, 23)}h ago",
+              lambda: f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T0{rng.randint(0, 9)}:00:00Z",
+              lambda: f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2026"]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+def bench_dates(res, repeat, sizes):
+    print("dates", flush=True)
+    strs = synthetic_date_strings(20_000)
+    distinct = sorted(set(strs))
+
+    def dateutil_only():
+        out = []
+        for s in distinct:
+            try:
+                out.append(main.dp.parse(s))
+            except Exception:
+                out.append(None)
+        return out
+    secs, _ = best_of(dateutil_only, repeat)
+    res.add("dates.dateutil_distinct", secs, len(distinct), "strings")
+
+    def cold():
+        main._parse_date_memo.cache_clear()
+        return [main.parse_date_guess(s) for s in distinct]
+    secs, _ = best_of(cold, repeat)
+    res.add("dates.fastpath_distinct", secs, len(distinct), "strings")
+    secs, _ = best_of(lambda: [main.parse_date_guess(s) for s in strs], repeat)
+    res.add("dates.memo_20000", secs, len(strs), "strings")
+    for n in sizes:
+        col = main.pd.Series(synthetic_date_strings(n), dtype=object)
+        secs, _ = best_of(lambda: main.parse_dates_column(col), repeat if n <= 100_000 else 1)
+        res.add(f"dates.column.{n}", secs, n, "rows")
+
+def bench_pipeline(res, repeat, sizes):
+    for n in sizes:
+        print(f"pipeline n={n:,}", flush=True)
+        reps = repeat if n <= 100_000 else 1
+        rows = synthetic_rows(n)
+        secs, deduped = best_of(lambda: main.dedupe(rows), reps)
+        res.add(f"dedupe.{n}", secs, n, "rows")
+        secs, (collapsed, _) = best_of(lambda: main.collapse_near_duplicates([dict(r) for r in deduped]), reps)
+        res.add(f"near_dedupe.{n}", secs, len(deduped), "rows")
+        secs, df = best_of(lambda: main.rank_frame(main.score_frame(main.listings_frame(collapsed))), reps)
+        res.add(f"score.{n}", secs, len(collapsed), "rows")
+
+        def render():
+            with main._spool() as csv_out, main._spool() as html_out:
+                return main.write_csv_stream(df, csv_out) + main.write_html_stream(df, html_out, "bench")
+        secs, nbytes = best_of(render, reps)
+        res.add(f"render.{n}", secs, len(df), "rows")
+        res.items[f"render.{n}"]["bytes"] = nbytes
+
+def compare(results, baseline, tolerance):
+    """Rows of (name, secs, base_secs, ratio, flag); flag is SLOWER/faster beyond tolerance."""
+    out = []
+    for name, cur in results.items():
+        base = baseline.get(name, {})
+        if "secs" not in cur or "secs" not in base or not base["secs"]:
+            continue
+        ratio = cur["secs"] / base["secs"]
+        flag = "SLOWER" if ratio > 1 + tolerance else "faster" if ratio < 1 / (1 + tolerance) else ""
+        out.append((name, cur["secs"], base["secs"], ratio, flag))
+    return out
+
+def record_fixtures():
+    """Overwrite the search-page fixtures with what the live boards serve now."""
+    for name, url in LIVE_SOURCES.items():
+        r = main.SESSION.get(url, timeout=30)
+        r.raise_for_status()
+        with open(os.path.join(FIXTURES, name), "w", encoding="utf-8") as f:
+            f.write(r.text)
+        print(f"recorded {name} <- {url} ({len(r.content):,} bytes)")
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--sizes", default="10000,100000", help="comma-separated synthetic posting counts")
+    ap.add_argument("--repeat", type=int, default=3, help="best-of runs per measurement")
+    ap.add_argument("--pages", type=int, default=20, help="fixture pages parsed per parser measurement")
+    ap.add_argument("--only", default="", help="comma-separated groups: parse,scrape,direct,dates,pipeline")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.5,
+                    help="slowdown ratio that counts as a regression (timings on shared hosts jitter ~30%%)")
+    ap.add_argument("--out", help="also write results JSON here")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any measurement is SLOWER")
+    ap.add_argument("--record", action="store_true", help="refresh fixtures from the live boards and exit")
+    ap.add_argument("--serve", type=int, metavar="PORT",
+                    help="serve the fixtures on 127.0.0.1:PORT until interrupted (e.g. ADZUNA_API_URL=.../adzuna)")
+    args = ap.parse_args(argv)
+
+    if args.record:
+        record_fixtures()
+        return 0
+    if args.serve is not None:
+        srv, base = start_fixture_server(args.serve)
+        print(f"serving bench/fixtures at {base}: " + ", ".join(sorted(FIXTURE_ROUTES)), flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            srv.shutdown()
+        return 0
+
+    main.dbg = lambda *a, **k: None  # the scrapers log per page; keep the timings about parsing
+    groups = {g.strip() for g in args.only.split(",") if g.strip()} or {"parse", "scrape", "direct", "dates", "pipeline"}
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    res = Results()
+    srv, base = start_fixture_server()
+    try:
+        if "parse" in groups:
+            bench_parsers(res, args.repeat, args.pages)
+        if "scrape" in groups:
+            bench_scrapers(res, args.repeat, base)
+        if "direct" in groups:
+            bench_seek_direct(res, args.repeat, base)
+        if "dates" in groups:
+            bench_dates(res, args.repeat, sizes)
+        if "pipeline" in groups:
+            bench_pipeline(res, args.repeat, sizes)
+    finally:
+        srv.shutdown()
+
+    report = {"meta": {"python": platform.python_version(), "machine": platform.machine(),
+                       "platform": platform.platform(), "pandas": main.pd.__version__},
+              "results": res.items}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    regressed = False
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+        rows = compare(res.items, baseline, args.tolerance)
+        print(f"\nvs baseline ({os.path.relpath(args.baseline)}, tolerance {args.tolerance:.0%})")
+        for name, cur, base_s, ratio, flag in rows:
+            print(f"  {name:<42} {cur * 1000:>10.2f} ms  base {base_s * 1000:>10.2f} ms  x{ratio:5.2f} {flag}")
+        regressed = any(flag == "SLOWER" for *_, flag in rows)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nbaseline written: {os.path.relpath(args.baseline)}")
+    return 1 if (args.check and regressed) else 0
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -1,518 +1,3141 @@
-# --- DEBUG LOGGER ------------------------------------------------------------
-import json, sys
-from datetime import datetime as _dt
-
-def dbg(msg, obj=None):
-    ts = _dt.utcnow().isoformat(timespec="seconds") + "Z"
-    line = f"[{ts}] {msg}"
-    print(line, flush=True)
-    if obj is not None:
-        try:
-            print(json.dumps(obj, ensure_ascii=False)[:4000], flush=True)
-        except Exception:
-            print(str(obj)[:4000], flush=True)
-# ----------------------------------------------------------------------------
-
-import os, io, hashlib, re, random
-from datetime import datetime, timedelta, timezone
-import pandas as pd
-
-# HTTP session with retries
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 JobScan/1.0"})
-_retry = Retry(total=3, backoff_factor=0.6, status_forcelist=(429, 500, 502, 503, 504))
-SESSION.mount("http://", HTTPAdapter(max_retries=_retry))
-SESSION.mount("https://", HTTPAdapter(max_retries=_retry))
-
-from bs4 import BeautifulSoup
-from dateutil import parser as dp
-
-from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient, ContentSettings
-
-# =========================== CONFIG FROM ENV =================================
-CITY_FILTER = os.getenv("CITY_FILTER", "SYDNEY").lower()
-TIME_WINDOW_DAYS = int(os.getenv("TIME_WINDOW_DAYS", "7"))
-REPORT_PREFIX = os.getenv("REPORT_PREFIX", "jobs_report")
-ALIGNMENT_TECH_PREF = [s.strip().lower() for s in os.getenv("ALIGNMENT_TECH_PREF", "azure,fabric,powerbi").split(",")]
-SECTOR_PRIORITY = [s.strip().lower() for s in os.getenv("SECTOR_PRIORITY", "").split(",") if s.strip()]
-SOURCES = [s.strip().lower() for s in os.getenv("SOURCES", "").split(",") if s.strip()]
-
-EMAIL_PROVIDER = os.getenv("EMAIL_PROVIDER", "sendgrid")
-SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
-GMAIL_SMTP_USER = os.getenv("GMAIL_SMTP_USER")
-GMAIL_SMTP_APP_PASSWORD = os.getenv("GMAIL_SMTP_APP_PASSWORD")
-EMAIL_TO = os.getenv("EMAIL_TO")
-
-STORAGE_ACCOUNT_NAME = os.getenv("STORAGE_ACCOUNT_NAME")
-STORAGE_CONTAINER = os.getenv("STORAGE_CONTAINER", "reports")
-
-UTC_NOW = datetime.now(timezone.utc)
-SINCE = UTC_NOW - timedelta(days=TIME_WINDOW_DAYS)
-
-SEEK_URL = os.getenv("SEEK_URL")  # e.g. https://www.seek.com.au/head-of-data-jobs/in-All-Sydney-NSW?daterange=3&tags=new
-
-dbg("[CFG] starting run", {
-    "city": CITY_FILTER,
-    "window_days": TIME_WINDOW_DAYS,
-    "sources": SOURCES,
-    "tech_pref": ALIGNMENT_TECH_PREF,
-    "sector_priority": SECTOR_PRIORITY
-})
-# ============================================================================
-
-def http_get(url, headers=None):
-    dbg("[HTTP] GET", {"url": url})
-    r = SESSION.get(url, headers=headers, timeout=30)
-    dbg("[HTTP] GET status", {"url": url, "status": r.status_code, "len": len(r.text)})
-    r.raise_for_status()
-    return r
-
-def normalize_text(t):
-    return re.sub(r"\s+"," ", t or "").strip()
-
-def parse_date_guess(s):
-    if not s:
-        return None
-    try:
-        dt = dp.parse(s, dayfirst=False, yearfirst=False)
-        if not dt.tzinfo:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except:
-        return None
-
-def in_sydney_scope(city_text):
-    t = (city_text or "").lower()
-    return "sydney" in t or "nsw" in t or "australia" in t
-
-def title_hits(title):
-    t = title.lower()
-    terms = [
-        "head of data","head of analytics","head of data & analytics","director of data","director of analytics",
-        "head of bi","head of insights","head of data platform","director of insights","data transformation","chief data officer","cdo"
-    ]
-    return any(term in t for term in terms)
-
-def engagement_type(title_or_body):
-    t = (title_or_body or "").lower()
-    if "contract" in t or "day rate" in t or "daily rate" in t or "contractor" in t:
-        return "Contract"
-    return "Permanent"
-
-def sector_of(body):
-    b = (body or "").lower()
-    for s in SECTOR_PRIORITY:
-        if s and s in b:
-            return s
-    return "edge-case/other"
-
-def alignment_score(title, body, sector, posted_dt):
-    score = 0
-    if title_hits(title): score += 3
-    for tech in ALIGNMENT_TECH_PREF:
-        if tech in (body or "").lower() or tech in title.lower():
-            score += 2
-    if sector and sector != "edge-case/other":
-        score += 2
-    if posted_dt and posted_dt >= SINCE:
-        score += 2
-    return max(1, min(10, score))
-
-def row(role, company, source_url, posted_dt, engagement, status, sector, rationale, score):
-    return {
-        "Role": role,
-        "Company/Agency": company,
-        "Source (with link)": source_url,
-        "Posting Date": posted_dt.strftime("%Y-%m-%d") if posted_dt else "",
-        "Engagement Type (Perm/Contract)": engagement,
-        "Status (Active/Closed)": status,
-        "Sector": sector,
-        "Rationale (why it fits)": rationale,
-        "Alignment Score (1–10)": score
-    }
-
-# ----------------------- SCRAPERS (MVP + direct) -----------------------------
-
-def scrape_seek():
-    url = ("https://www.seek.com.au/jobs"
-           "?where=Sydney&keywords=head%20of%20data%20OR%20head%20of%20analytics%20"
-           "OR%20director%20of%20data%20OR%20director%20of%20analytics")
-    dbg("[SEEK] fetch begin", {"url": url})
-    r = http_get(url); soup = BeautifulSoup(r.text, "html.parser")
-
-    anchors = soup.select("a[href*='/job/']")
-    dbg("[SEEK] raw anchors", {"count": len(anchors)})
-
-    out = []
-    for a in anchors:
-        title = normalize_text(a.get_text())
-        href = a.get("href", "")
-        if not title or not href:
-            continue
-        full = "https://www.seek.com.au" + href if href.startswith("/") else href
-        if not title_hits(title):
-            continue
-        posted_dt = UTC_NOW  # assume fresh without detail click
-        if posted_dt < SINCE:
-            continue
-        sector = "edge-case/other"
-        score = alignment_score(title, "", sector, posted_dt)
-        out.append(row(title, "Seek Listing", full, posted_dt, engagement_type(title), "Active", sector,
-                       "Title match; Sydney search", score))
-    dbg("[SEEK] final rows", {"count": len(out)})
-    return out
-
-def scrape_indeed():
-    url = ("https://au.indeed.com/jobs"
-           "?q=head+of+data+OR+head+of+analytics+OR+director+of+data+OR+director+of+analytics"
-           "&l=Sydney+NSW")
-    dbg("[INDEED] fetch begin", {"url": url})
-    r = http_get(url); soup = BeautifulSoup(r.text, "html.parser")
-
-    cards = soup.select("a[href*='/pagead/'], a[href*='/viewjob']")
-    dbg("[INDEED] raw anchors", {"count": len(cards)})
-
-    out = []
-    for card in cards:
-        title = normalize_text(card.get_text())
-        href = card.get("href", "")
-        if not title or not href:
-            continue
-        full = "https://au.indeed.com" + href if href.startswith("/") else href
-        if not title_hits(title):
-            continue
-        posted_dt = UTC_NOW
-        if posted_dt < SINCE:
-            continue
-        sector = "edge-case/other"
-        score = alignment_score(title, "", sector, posted_dt)
-        out.append(row(title, "Indeed Listing", full, posted_dt, engagement_type(title), "Active", sector,
-                       "Title match; Sydney search", score))
-    dbg("[INDEED] final rows", {"count": len(out)})
-    return out
-
-def _parse_seek_listed_to_dt(text: str):
-    t = (text or "").lower()
-    try:
-        if "just" in t or "today" in t:
-            return UTC_NOW
-        m = re.search(r"listed\s+(\d+)\s+day", t)
-        if m:
-            days = int(m.group(1))
-            return UTC_NOW - timedelta(days=days)
-    except:
-        pass
-    return UTC_NOW
-
-def _report_folder():
-    return f"{REPORT_PREFIX}/{UTC_NOW.strftime('%Y-%m-%d')}"
-
-def scrape_seek_direct():
-    """
-    Load a *full* SEEK search URL via Playwright and parse listing cards.
-    If blocked/empty, uploads seek_screenshot.png to the report folder for diagnosis.
-    """
-    if not SEEK_URL:
-        dbg("[SEEK/DIRECT] missing SEEK_URL")
-        return []
-
-    try:
-        from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-    except ModuleNotFoundError as e:
-        dbg("[SEEK/DIRECT] Playwright not installed in image", str(e))
-        raise
-
-    dbg("[SEEK/DIRECT] fetch begin", {"url": SEEK_URL})
-    out = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=[
-            "--disable-blink-features=AutomationControlled",
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-        ])
-        ctx = browser.new_context(
-            user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"),
-            locale="en-AU",
-            viewport={"width": 1380, "height": 1800},
-        )
-        page = ctx.new_page()
-        try:
-            page.goto(SEEK_URL, wait_until="domcontentloaded", timeout=60000)
-        except PWTimeout:
-            dbg("[SEEK/DIRECT] timeout on goto")
-            png = page.screenshot(full_page=True)
-            upload_with_msi(png, f"{_report_folder()}/seek_screenshot.png", content_type="image/png")
-            ctx.close(); browser.close()
-            return []
-
-        # Try cookie/consent popups
-        try:
-            page.get_by_role("button", name=re.compile("accept|agree|got it|okay|ok", re.I)).click(timeout=2500)
-        except Exception:
-            pass
-
-        # Basic anti-bot: small wait + scroll
-        page.wait_for_timeout(1000 + random.randint(0, 1200))
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        page.wait_for_timeout(1200)
-
-        # Candidate job-card selectors
-        card_sel_variants = [
-            "article[data-automation='normalJob']",
-            "[data-automation='job-card']",
-            "article",  # fallback
-        ]
-        job_cards = None
-        for sel in card_sel_variants:
-            try:
-                count = page.locator(sel).count()
-                if count > 0:
-                    job_cards = (sel, count)
-                    break
-            except Exception:
-                continue
-
-        if not job_cards:
-            dbg("[SEEK/DIRECT] no cards found; uploading screenshot")
-            try:
-                png = page.screenshot(full_page=True)
-                upload_with_msi(png, f"{_report_folder()}/seek_screenshot.png", content_type="image/png")
-            except Exception as e:
-                dbg("[SEEK/DIRECT] screenshot upload failed", str(e))
-            ctx.close(); browser.close()
-            return []
-
-        sel, count = job_cards
-        dbg("[SEEK/DIRECT] card selector", {"selector": sel, "count": count})
-
-        for i in range(min(count, 120)):
-            try:
-                card = page.locator(sel).nth(i)
-
-                # title
-                title = ""
-                try:
-                    title = card.locator("[data-automation='jobTitle']").inner_text(timeout=1800).strip()
-                except Exception:
-                    links = card.locator("a[href*='/job/']")
-                    if links.count() > 0:
-                        title = (links.first.inner_text(timeout=1200) or "").strip()
-
-                if not title or not title_hits(title):
-                    continue
-
-                # href
-                href = ""
-                try:
-                    href = card.locator("a[href*='/job/']").first.get_attribute("href") or ""
-                except Exception:
-                    pass
-                if not href:
-                    continue
-                full = "https://www.seek.com.au" + href if href.startswith("/") else href
-
-                # company
-                company = "Seek Listing"
-                try:
-                    company = (card.locator("[data-automation='jobCompany']").inner_text(timeout=1200) or "Seek Listing").strip()
-                except Exception:
-                    pass
-
-                # location (scope)
-                location = ""
-                try:
-                    location = (card.locator("[data-automation='jobLocation']").inner_text(timeout=1200) or "").strip()
-                except Exception:
-                    pass
-
-                # listed date
-                listed_text = ""
-                try:
-                    listed_text = (card.locator("[data-automation='jobListingDate']").inner_text(timeout=1200) or "").strip()
-                except Exception:
-                    pass
-
-                posted_dt = _parse_seek_listed_to_dt(listed_text)
-                if posted_dt < SINCE:
-                    continue
-
-                sector = "edge-case/other"
-                score = alignment_score(title, "", sector, posted_dt)
-                out.append(row(
-                    role=title,
-                    company=company,
-                    source_url=full,
-                    posted_dt=posted_dt,
-                    engagement=engagement_type(title),
-                    status="Active",
-                    sector=sector,
-                    rationale="SEEK search URL; leadership title match",
-                    score=score
-                ))
-            except Exception:
-                continue
-
-        ctx.close()
-        browser.close()
-
-    dbg("[SEEK/DIRECT] final rows", {"count": len(out)})
-    if not out:
-        # No rows but page loaded; save screenshot for inspection
-        try:
-            # Re-open a quick session to capture again (last resort)
-            from playwright.sync_api import sync_playwright
-            with sync_playwright() as p:
-                b = p.chromium.launch(headless=True)
-                c = b.new_context(viewport={"width": 1380, "height": 1800})
-                pg = c.new_page()
-                try:
-                    pg.goto(SEEK_URL, wait_until="domcontentloaded", timeout=30000)
-                    pg.wait_for_timeout(1200)
-                    png = pg.screenshot(full_page=True)
-                    upload_with_msi(png, f"{_report_folder()}/seek_screenshot.png", content_type="image/png")
-                except Exception:
-                    pass
-                c.close(); b.close()
-        except Exception:
-            pass
-    return out
-
-# ----------------------------------------------------------------------------
-
-SCRAPERS = {
-    "seek": scrape_seek,
-    "indeed": scrape_indeed,
-    "seek_direct": scrape_seek_direct,  # Playwright path
-    # "adzuna": scrape_adzuna,          # if you add API path later
-}
-
-def dedupe(rows):
-    seen = set(); out = []
-    for r in rows:
-        key = (r["Role"].lower(), r["Company/Agency"].lower(), r["Source (with link)"])
-        if key in seen:
-            continue
-        seen.add(key); out.append(r)
-    return out
-
-def to_html_table(df: pd.DataFrame, report_title: str):
-    header = f"<h2>{report_title}</h2>"
-    return header + df.to_html(index=False, escape=False)
-
-def upload_with_msi(local_bytes: bytes, path: str, content_type: str = "text/csv"):
-    cred = DefaultAzureCredential()
-    account_url = f"https://{STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
-    bsc = BlobServiceClient(account_url=account_url, credential=cred)
-
-    container = bsc.get_container_client(STORAGE_CONTAINER)
-    try:
-        container.create_container()
-    except Exception:
-        pass
-
-    blob = container.get_blob_client(path)
-    blob.upload_blob(
-        local_bytes,
-        overwrite=True,
-        content_settings=ContentSettings(content_type=content_type),
-    )
-    dbg("[BLOB] uploaded", {"path": path, "bytes": len(local_bytes)})
-
-def main():
-    # sanity: unknown sources notice
-    KNOWN = set(SCRAPERS.keys())
-    unknown = [s for s in SOURCES if s not in KNOWN]
-    if unknown:
-        dbg("[CFG] unknown sources requested", {"unknown": unknown})
-
-    all_rows = []
-    per_source = {}
-
-    # If SOURCES is empty, run all; else restrict to provided set
-    selected = set(SOURCES) if SOURCES else set(SCRAPERS.keys())
-    dbg("[RUN] selected sources", list(selected))
-
-    # Build filenames/folder up-front so helpers can reuse
-    folder = f"{REPORT_PREFIX}/{UTC_NOW.strftime('%Y-%m-%d')}"
-    csv_name = f"{folder}/report.csv"
-    html_name = f"{folder}/report.html"
-    debug_name = f"{folder}/debug.json"
-    title = f"Sydney Data Leadership Intelligence Report — {datetime.now().strftime('%d %B %Y')} (08:30 Sydney)"
-
-    for key, fn in SCRAPERS.items():
-        if key not in selected:
-            continue
-        try:
-            dbg("[RUN] source begin", {"source": key})
-            rows = fn()
-            per_source[key] = len(rows)
-            all_rows.extend(rows)
-            dbg("[RUN] source done", {"source": key, "rows": len(rows)})
-        except Exception as e:
-            per_source[key] = f"error: {type(e).__name__}"
-            dbg(f"[ERR] {key}", str(e))
-
-    dbg("[RUN] totals pre-dedupe", {"rows": len(all_rows), "per_source": per_source})
-
-    all_rows = dedupe(all_rows)
-    dbg("[RUN] totals post-dedupe", {"rows": len(all_rows)})
-
-    df = pd.DataFrame(all_rows)
-
-    # Sort by score desc, then date desc
-    if not df.empty:
-        df["ScoreInt"] = pd.to_numeric(df["Alignment Score (1–10)"], errors="coerce").fillna(1).astype(int)
-        df["Posting Date Sort"] = pd.to_datetime(df["Posting Date"], errors="coerce")
-        df = df.sort_values(by=["ScoreInt","Posting Date Sort"], ascending=[False, False]).drop(columns=["ScoreInt","Posting Date Sort"])
-
-    csv_bytes = df.to_csv(index=False).encode("utf-8") if not df.empty else b""
-    html_bytes = (
-        to_html_table(df, title).encode("utf-8")
-        if not df.empty else "<p>No matching roles today.</p>".encode("utf-8")
-    )
-
-    # Debug artifact (always written)
-    summary = {
-        "since_utc": SINCE.isoformat(),
-        "now_utc": UTC_NOW.isoformat(),
-        "selected_sources": list(selected),
-        "per_source": per_source,
-        "total_rows": 0 if df.empty else int(df.shape[0])
-    }
-    debug_bytes = json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8")
-
-    upload_with_msi(debug_bytes, debug_name, content_type="application/json")
-    upload_with_msi(csv_bytes,  csv_name,  content_type="text/csv")
-    upload_with_msi(html_bytes, html_name, content_type="text/html")
-
-    # Optional: direct email via SendGrid (Logic App recommended instead)
-    if EMAIL_TO and EMAIL_PROVIDER.lower()=="sendgrid" and SENDGRID_API_KEY and csv_bytes:
-        try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
-            message = Mail(
-                from_email="no-reply@yourdomain.com",
-                to_emails=EMAIL_TO,
-                subject=title,
-                html_content=html_bytes.decode("utf-8")
-            )
-            import base64
-            attachment = Attachment()
-            attachment.file_content = FileContent(base64.b64encode(csv_bytes).decode())
-            attachment.file_type = FileType("text/csv")
-            attachment.file_name = FileName("report.csv")
-            attachment.disposition = Disposition("attachment")
-            message.attachment = attachment
-            SendGridAPIClient(SENDGRID_API_KEY).send(message)
-            dbg("[EMAIL] sendgrid ok")
-        except Exception as e:
-            dbg("[EMAIL] sendgrid error", str(e))
-
-if __name__ == "__main__":
-    main()
+# --- DEBUG LOGGER ------------------------------------------------------------
+import json, sys
+from datetime import datetime as _dt
+
+def dbg(msg, obj=None):
+    ts = _dt.utcnow().isoformat(timespec="seconds") + "Z"
+    line = f"[{ts}] {msg}"
+    print(line, flush=True)
+    if obj is not None:
+        try:
+            print(json.dumps(obj, ensure_ascii=False)[:4000], flush=True)
+        except Exception:
+            print(str(obj)[:4000], flush=True)
+# ----------------------------------------------------------------------------
+
+import os, io, hashlib, re, random, threading, time, asyncio, sqlite3, zlib, gzip, shutil, tempfile, base64, functools, signal, inspect
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, aclosing
+from urllib.parse import urlsplit, urlencode
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+
+# HTTP session with retries
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 JobScan/1.0"})
+# 429/403 are left to HOST_LIMITER (adaptive backoff + fail-fast), not blind adapter retries
+_retry = Retry(total=3, backoff_factor=0.6, status_forcelist=(500, 502, 503, 504), respect_retry_after_header=False)
+# One pooled adapter shared by every HTTP source; size it for the source workers.
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+_adapter = HTTPAdapter(max_retries=_retry, pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+from bs4 import BeautifulSoup
+from dateutil import parser as dp
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.identity import DefaultAzureCredential
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+# =========================== CONFIG FROM ENV =================================
+CITY_FILTER = os.getenv("CITY_FILTER", "SYDNEY").lower()
+TIME_WINDOW_DAYS = int(os.getenv("TIME_WINDOW_DAYS", "7"))
+REPORT_PREFIX = os.getenv("REPORT_PREFIX", "jobs_report")
+ALIGNMENT_TECH_PREF = [s.strip().lower() for s in os.getenv("ALIGNMENT_TECH_PREF", "azure,fabric,powerbi").split(",")]
+SECTOR_PRIORITY = [s.strip().lower() for s in os.getenv("SECTOR_PRIORITY", "").split(",") if s.strip()]
+SOURCES = [s.strip().lower() for s in os.getenv("SOURCES", "").split(",") if s.strip()]
+SOURCE_WORKERS = max(1, int(os.getenv("SOURCE_WORKERS", "4")))      # concurrent HTTP sources
+SOURCE_TIMEOUT_S = float(os.getenv("SOURCE_TIMEOUT_S", "300"))       # per-source deadline
+
+# Pagination / async page fetching
+SEEK_MAX_PAGES = max(1, int(os.getenv("SEEK_MAX_PAGES", "3")))
+SEEK_MAX_RESULTS = int(os.getenv("SEEK_MAX_RESULTS", "200"))
+INDEED_MAX_PAGES = max(1, int(os.getenv("INDEED_MAX_PAGES", "3")))
+INDEED_MAX_RESULTS = int(os.getenv("INDEED_MAX_RESULTS", "200"))
+HTTP_PAGE_CONCURRENCY = max(1, int(os.getenv("HTTP_PAGE_CONCURRENCY", "4")))   # in-flight pages per source
+HTTP_HOST_MIN_INTERVAL_S = float(os.getenv("HTTP_HOST_MIN_INTERVAL_S", "0.5"))  # spacing between requests to one host
+HTTP_429_RETRIES = int(os.getenv("HTTP_429_RETRIES", "2"))
+HTTP_429_BACKOFF_S = float(os.getenv("HTTP_429_BACKOFF_S", "5"))
+HTTP_HOST_BURST = max(1, int(os.getenv("HTTP_HOST_BURST", "1")))                # requests a host takes back to back
+HTTP_HOST_MAX_INTERVAL_S = float(os.getenv("HTTP_HOST_MAX_INTERVAL_S", "30"))   # slowest spacing / longest wait per host
+HTTP_HOST_BLOCK_LIMIT = max(1, int(os.getenv("HTTP_HOST_BLOCK_LIMIT", "3")))    # 403/429s in a row before a host fails fast
+
+# Per-source circuit breaker, persisted across runs
+BREAKER_ENABLED = os.getenv("BREAKER", "1") != "0"
+BREAKER_PATH = os.getenv("BREAKER_PATH", ".cache/state/breakers.json")
+BREAKER_THRESHOLD = max(1, int(os.getenv("BREAKER_THRESHOLD", "2")))            # blocked runs in a row before skipping
+BREAKER_COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", "21600"))            # first skip window; doubles per re-trip
+BREAKER_MAX_COOLDOWN_S = float(os.getenv("BREAKER_MAX_COOLDOWN_S", "172800"))
+
+# On-disk HTTP response cache (mount HTTP_CACHE_DIR to keep it between container runs)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".cache/http")
+HTTP_CACHE_TTL_S = float(os.getenv("HTTP_CACHE_TTL_S", "3600"))
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "256"))
+
+EMAIL_PROVIDER = os.getenv("EMAIL_PROVIDER", "sendgrid")
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+GMAIL_SMTP_USER = os.getenv("GMAIL_SMTP_USER")
+GMAIL_SMTP_APP_PASSWORD = os.getenv("GMAIL_SMTP_APP_PASSWORD")
+EMAIL_TO = os.getenv("EMAIL_TO")
+EMAIL_TOP_N = int(os.getenv("EMAIL_TOP_N", "25"))                     # rows in the email body
+EMAIL_ATTACH_MAX_BYTES = int(os.getenv("EMAIL_ATTACH_MAX_BYTES", str(5 * 1024 * 1024)))
+
+REPORT_CHUNK_ROWS = max(1, int(os.getenv("REPORT_CHUNK_ROWS", "5000")))
+REPORT_SPOOL_MB = float(os.getenv("REPORT_SPOOL_MB", "8"))           # spill report files to disk past this
+
+STORAGE_ACCOUNT_NAME = os.getenv("STORAGE_ACCOUNT_NAME")
+STORAGE_CONTAINER = os.getenv("STORAGE_CONTAINER", "reports")
+STORAGE_CONNECTION_STRING = os.getenv("STORAGE_CONNECTION_STRING")  # e.g. Azurite; overrides MSI
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "").lower()         # azure | local (default: azure if configured)
+LOCAL_OUTPUT_DIR = os.getenv("LOCAL_OUTPUT_DIR", "out")
+STORAGE_GZIP_TYPES = {s.strip() for s in os.getenv("STORAGE_GZIP_TYPES", "").split(",") if s.strip()}  # e.g. text/csv,text/html
+
+# Seen-jobs state (incremental runs); STATE_BLOB_PATH syncs the DB through STORAGE_CONTAINER
+STATE_ENABLED = os.getenv("STATE", "1") != "0"
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", ".cache/state/jobs.sqlite")
+STATE_BLOB_PATH = os.getenv("STATE_BLOB_PATH", "")
+STATE_REPORT_MODE = os.getenv("STATE_REPORT_MODE", "all").lower()  # all | changes
+
+# Detail-page enrichment (body, posted date, location per posting)
+ENRICH_ENABLED = os.getenv("ENRICH", "1") != "0"
+ENRICH_WORKERS = max(1, int(os.getenv("ENRICH_WORKERS", "4")))
+ENRICH_MAX_FETCHES = int(os.getenv("ENRICH_MAX_FETCHES", "60"))   # per-run fetch budget
+ENRICH_BODY_MAX_CHARS = int(os.getenv("ENRICH_BODY_MAX_CHARS", "20000"))
+DETAIL_CACHE_PATH = os.getenv("DETAIL_CACHE_PATH", ".cache/state/details.sqlite")
+
+# Cross-source near-duplicate collapsing
+NEARDUP_ENABLED = os.getenv("NEARDUP", "1") != "0"
+NEARDUP_THRESHOLD = float(os.getenv("NEARDUP_THRESHOLD", "0.7"))   # title-token Jaccard
+NEARDUP_BODY_THRESHOLD = float(os.getenv("NEARDUP_BODY_THRESHOLD", "0.5"))  # body-word Jaccard backing placeholder rows
+
+# Historical Parquet archive (date-partitioned); mirrored to ARCHIVE_PREFIX in the artifact store
+ARCHIVE_ENABLED = os.getenv("ARCHIVE", "1") != "0"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", ".cache/archive")
+ARCHIVE_PREFIX = os.getenv("ARCHIVE_PREFIX", f"{REPORT_PREFIX}_archive")
+
+METRICS_PROM_PATH = os.getenv("METRICS_PROM_PATH")  # optional Prometheus textfile, e.g. /cache/metrics/jobscan.prom
+
+UTC_NOW = datetime.now(timezone.utc)
+SINCE = UTC_NOW - timedelta(days=TIME_WINDOW_DAYS)
+
+SEEK_URL = os.getenv("SEEK_URL")  # e.g. https://www.seek.com.au/head-of-data-jobs/in-All-Sydney-NSW?daterange=3&tags=new
+SEEK_DIRECT_EXTRACT = os.getenv("SEEK_DIRECT_EXTRACT", "evaluate").lower()  # evaluate | snapshot | locator
+SEEK_DIRECT_MAX_CARDS = int(os.getenv("SEEK_DIRECT_MAX_CARDS", "120"))
+HTML_PARSER = os.getenv("HTML_PARSER", "auto").lower()  # auto | selectolax | lxml | soup
+
+# Adzuna job-search API (source "adzuna"; enabled once ADZUNA_APP_ID/ADZUNA_APP_KEY are set).
+# ADZUNA_API_URL can point at a local mock serving the same JSON.
+ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
+ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY")
+ADZUNA_API_URL = os.getenv("ADZUNA_API_URL", "https://api.adzuna.com/v1/api/jobs/au/search").rstrip("/")
+ADZUNA_QUERY = os.getenv("ADZUNA_QUERY", "data analytics")  # any of these words; titles are filtered by MATCHER
+ADZUNA_WHERE = os.getenv("ADZUNA_WHERE", "Sydney")
+ADZUNA_MAX_PAGES = max(1, int(os.getenv("ADZUNA_MAX_PAGES", "2")))
+ADZUNA_MAX_RESULTS = int(os.getenv("ADZUNA_MAX_RESULTS", "200"))
+ADZUNA_MIN_INTERVAL_S = float(os.getenv("ADZUNA_MIN_INTERVAL_S", "2.5"))  # free tier allows 25 calls/minute
+
+# Daemon mode: one long-lived process re-running each source on its own cadence
+RUN_MODE = os.getenv("RUN_MODE", "once").lower()                  # once | daemon
+SOURCE_SCHEDULE = os.getenv("SOURCE_SCHEDULE", "")                # e.g. indeed=1h/5m,seek=1h,seek_direct=6h/20m
+DAEMON_DEFAULT_INTERVAL = os.getenv("DAEMON_DEFAULT_INTERVAL", "1h")
+DAEMON_JITTER_FRAC = float(os.getenv("DAEMON_JITTER_FRAC", "0.1"))  # jitter when a source gives none
+DAEMON_EMAIL = os.getenv("DAEMON_EMAIL", "daily").lower()         # daily | every | off
+RUN_LOCK_PATH = os.getenv("RUN_LOCK_PATH", ".cache/state/run.lock")
+# Search/listing pages skip the HTTP cache's fresh window (a conditional GET still can
+# serve a 304 from disk); on by default in daemon mode, whose cycles are there to see
+# new postings. Detail pages keep HTTP_CACHE_TTL_S either way.
+HTTP_REVALIDATE_LISTINGS = os.getenv("HTTP_REVALIDATE_LISTINGS", "1" if RUN_MODE == "daemon" else "0") != "0"
+
+dbg("[CFG] starting run", {
+    "city": CITY_FILTER,
+    "window_days": TIME_WINDOW_DAYS,
+    "sources": SOURCES,
+    "tech_pref": ALIGNMENT_TECH_PREF,
+    "sector_priority": SECTOR_PRIORITY,
+    "source_workers": SOURCE_WORKERS,
+    "source_timeout_s": SOURCE_TIMEOUT_S,
+    "max_pages": {"seek": SEEK_MAX_PAGES, "indeed": INDEED_MAX_PAGES}
+})
+# ============================================================================
+
+# ----------------------- METRICS ---------------------------------------------
+
+_HIST_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+class _Hist:
+    __slots__ = ("count", "sum", "max", "buckets")
+
+    def __init__(self):
+        self.count, self.sum, self.max = 0, 0.0, 0.0
+        self.buckets = [0] * len(_HIST_BUCKETS_S)
+
+    def add(self, v):
+        self.count += 1
+        self.sum += v
+        self.max = max(self.max, v)
+        for i, le in enumerate(_HIST_BUCKETS_S):
+            if v <= le:
+                self.buckets[i] += 1
+                break
+
+class Metrics:
+    """
+    Per-run instrumentation: timed spans (context manager or decorator),
+    counters and histograms, each optionally labelled (host=..., source=...).
+    Thread-safe. snapshot() feeds debug.json; to_prometheus() renders the
+    same data in Prometheus text format for a node-exporter textfile.
+    """
+    def __init__(self, namespace="jobscan"):
+        self.ns = namespace
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._hists = {}   # (name, labels) -> _Hist; spans live under name "span" with a span label
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def incr(self, name, n=1, **labels):
+        k = self._key(name, labels)
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0) + n
+
+    def observe(self, name, value, **labels):
+        k = self._key(name, labels)
+        with self._lock:
+            self._hists.setdefault(k, _Hist()).add(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("span_seconds", time.perf_counter() - t0, span=name, **labels)
+
+    def timed(self, name, **labels):
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*a, **kw):
+                with self.span(name, **labels):
+                    return fn(*a, **kw)
+            return wrapper
+        return deco
+
+    @staticmethod
+    def _label_str(labels):
+        return "{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""
+
+    def snapshot(self):
+        """{"stage_secs", "spans", "counters", "histograms"} with stable, diffable keys."""
+        with self._lock:
+            counters = dict(self._counters)
+            hists = {k: (h.count, h.sum, h.max) for k, h in self._hists.items()}
+        stage_secs, spans, histograms = {}, {}, {}
+        for (name, labels), (count, total, mx) in sorted(hists.items()):
+            if name == "span_seconds":
+                d = dict(labels)
+                span_name = d.pop("span")
+                stage_secs[span_name] = round(stage_secs.get(span_name, 0.0) + total, 3)
+                spans[span_name + self._label_str(tuple(sorted(d.items())))] = {
+                    "count": count, "total_s": round(total, 3), "max_s": round(mx, 3),
+                    "mean_s": round(total / count, 4) if count else 0.0}
+            else:
+                histograms[name + self._label_str(labels)] = {
+                    "count": count, "sum": round(total, 3), "max": round(mx, 3)}
+        return {
+            "stage_secs": stage_secs,
+            "spans": spans,
+            "counters": {name + self._label_str(labels): v for (name, labels), v in sorted(counters.items())},
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self):
+        def esc(v):
+            return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        def labels_of(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            hists = sorted((k, (h.count, h.sum, list(h.buckets))) for k, h in self._hists.items())
+        lines = []
+        for name in sorted({n for (n, _), _ in counters}):
+            lines.append(f"# TYPE {self.ns}_{name} counter")
+            lines += [f"{self.ns}_{name}{labels_of(lb)} {v}" for (n, lb), v in counters if n == name]
+        for name in sorted({n for (n, _), _ in hists}):
+            metric = f"{self.ns}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for (n, lb), (count, total, buckets) in hists:
+                if n != name:
+                    continue
+                cum = 0
+                for le, c in zip(_HIST_BUCKETS_S, buckets):
+                    cum += c
+                    lines.append(f"{metric}_bucket{labels_of(lb, [('le', le)])} {cum}")
+                lines.append(f"{metric}_bucket{labels_of(lb, [('le', '+Inf')])} {count}")
+                lines.append(f"{metric}_sum{labels_of(lb)} {total:.6f}")
+                lines.append(f"{metric}_count{labels_of(lb)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(path + ".tmp", path)
+
+METRICS = Metrics()
+span = METRICS.span
+timed = METRICS.timed
+
+class SourceCancelled(Exception):
+    """Raised inside a scraper once its per-source deadline has passed."""
+
+class SourceBlocked(Exception):
+    """The board is refusing us (bot wall, 403/429s); counts against the source's circuit breaker."""
+
+class HostBlocked(SourceBlocked):
+    """A host kept answering 403/429 this run; further requests to it fail fast."""
+
+# Set per worker thread by run_sources() so helpers can stop a timed-out source.
+_SOURCE_CTX = threading.local()
+
+def is_cancelled():
+    ev = getattr(_SOURCE_CTX, "cancel", None)
+    return ev is not None and ev.is_set()
+
+def check_cancelled():
+    if is_cancelled():
+        raise SourceCancelled(getattr(_SOURCE_CTX, "source", "?"))
+
+def note_partial(reason):
+    """Mark the running source's scan incomplete, so postings it didn't reach aren't closed."""
+    notes = getattr(_SOURCE_CTX, "partial", None)
+    if notes is not None:
+        notes.append(reason)
+
+def note_aged_out(key):
+    """Record a posting the source still lists but that fell out of the window, so it's retired, not closed."""
+    keys = getattr(_SOURCE_CTX, "aged", None)
+    if keys is not None:
+        keys.append(key)
+
+# ----------------------- HTTP RESPONSE CACHE ---------------------------------
+
+# Query params that carry API credentials (Adzuna's app_id/app_key and the usual
+# suspects); masked wherever a URL is logged, stored or put in an error message.
+_SECRET_PARAM_RE = re.compile(
+    r"([?&](?:app_id|app_key|api_key|apikey|key|token|access_token|client_secret|secret|password)=)[^&#\s'\"]*",
+    re.IGNORECASE)
+
+def _redact_url(text):
+    """Mask credential query params in a URL (or any text quoting one)."""
+    return _SECRET_PARAM_RE.sub(r"\1REDACTED", text) if text else text
+
+class HttpCache:
+    """
+    On-disk cache of successful GET responses, keyed on URL + request headers.
+    Fresh entries (younger than ttl_s) are served without touching the network;
+    stale ones are revalidated with If-None-Match / If-Modified-Since and a 304
+    is served from disk. Total size is capped with least-recently-used eviction
+    (recency = meta file mtime, touched on every hit).
+    """
+    def __init__(self, root, ttl_s, max_bytes):
+        self.root = root
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # lazily computed on first store
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "stores": 0,
+                         "evictions": 0, "bytes_saved": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def reset_counters(self):
+        """Zero the per-run counters (a daemon reports each cycle on its own)."""
+        with self._lock:
+            self.counters = dict.fromkeys(self.counters, 0)
+
+    def key(self, url, headers):
+        merged = {k.lower(): v for k, v in SESSION.headers.items()}
+        merged.update({k.lower(): v for k, v in (headers or {}).items()})
+        raw = url + "\n" + "\n".join(f"{k}:{v}" for k, v in sorted(merged.items()))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        d = os.path.join(self.root, key[:2])
+        return os.path.join(d, key + ".json"), os.path.join(d, key + ".body")
+
+    def lookup(self, key):
+        """Return (meta, body) or None."""
+        meta_p, body_p = self._paths(key)
+        try:
+            with open(meta_p, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_p, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(meta_p)  # LRU recency
+        except OSError:
+            pass
+        return meta, body
+
+    def is_fresh(self, meta):
+        return time.time() - meta.get("stored_at", 0) < self.ttl_s
+
+    def store(self, key, url, resp):
+        if "no-store" in resp.headers.get("Cache-Control", "").lower():
+            return
+        meta = {
+            "url": _redact_url(url),
+            "status": resp.status_code,
+            "encoding": resp.encoding,
+            "headers": {k.lower(): v for k, v in resp.headers.items()
+                        if k.lower() in ("content-type", "etag", "last-modified")},
+            "stored_at": time.time(),
+        }
+        self._write(key, meta, resp.content)
+        self._count("stores")
+
+    def refresh(self, key, meta, resp):
+        """Record a 304: bump stored_at and take any new validators."""
+        for h in ("etag", "last-modified"):
+            if resp.headers.get(h):
+                meta["headers"][h] = resp.headers[h]
+        meta["stored_at"] = time.time()
+        self._write(key, meta, None)
+
+    def _write(self, key, meta, body):
+        meta_p, body_p = self._paths(key)
+        try:
+            os.makedirs(os.path.dirname(meta_p), exist_ok=True)
+            added = 0
+            if body is not None:
+                old = os.path.getsize(body_p) if os.path.exists(body_p) else 0
+                tmp = f"{body_p}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, body_p)
+                added = len(body) - old
+            tmp = f"{meta_p}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, meta_p)
+        except OSError as e:
+            dbg("[CACHE] write failed", {"key": key, "error": str(e)})
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += added
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self):
+        out = []
+        for dirpath, _, files in os.walk(self.root):
+            for fn in files:
+                if fn.endswith(".json"):
+                    meta_p = os.path.join(dirpath, fn)
+                    body_p = meta_p[:-5] + ".body"
+                    try:
+                        out.append((os.path.getmtime(meta_p), meta_p, body_p,
+                                    os.path.getsize(body_p) if os.path.exists(body_p) else 0))
+                    except OSError:
+                        continue
+        return out
+
+    def _scan_size(self):
+        return sum(e[3] for e in self._entries())
+
+    def evict(self):
+        """Drop least-recently-used entries until under 90% of max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            size = sum(e[3] for e in entries)
+            target = self.max_bytes * 0.9
+            removed = 0
+            for _, meta_p, body_p, n in entries:
+                if size <= target:
+                    break
+                for p in (meta_p, body_p):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                size -= n
+                removed += 1
+            self._size = size
+            self.counters["evictions"] += removed
+        if removed:
+            dbg("[CACHE] evicted", {"entries": removed, "bytes_now": size})
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, dir=self.root, ttl_s=self.ttl_s)
+
+HTTP_CACHE = HttpCache(HTTP_CACHE_DIR, HTTP_CACHE_TTL_S, int(HTTP_CACHE_MAX_MB * 1024 * 1024)) if HTTP_CACHE_ENABLED else None
+
+def _cached_response(url, meta, body):
+    r = requests.Response()
+    r.status_code = meta.get("status", 200)
+    r.reason = "OK"
+    r.url = url
+    r._content = body
+    r.encoding = meta.get("encoding")
+    r.headers = requests.structures.CaseInsensitiveDict(meta.get("headers", {}))
+    r.from_cache = True
+    return r
+
+def http_get(url, headers=None, revalidate=False):
+    """GET through HTTP_CACHE; revalidate=True ignores the fresh window and always asks the server."""
+    check_cancelled()
+    host = urlsplit(url).netloc
+    with span("http_get", host=host):
+        return _http_get(url, headers, host, revalidate)
+
+def _serve_cache_hit(url, entry):
+    HTTP_CACHE._count("hits"); HTTP_CACHE._count("bytes_saved", len(entry[1]))
+    METRICS.incr("http_cache_total", result="hit")
+    dbg("[HTTP] GET cache hit", {"url": _redact_url(url), "len": len(entry[1])})
+    return _cached_response(url, *entry)
+
+def _fresh_cache_hit(url, headers=None):
+    """The cached response when HTTP_CACHE holds a fresh entry for url, else None. Never touches the network."""
+    cache = HTTP_CACHE
+    if cache is None:
+        return None
+    entry = cache.lookup(cache.key(url, headers))
+    return _serve_cache_hit(url, entry) if entry and cache.is_fresh(entry[0]) else None
+
+def _http_get(url, headers, host, revalidate=False):
+    cache, key, entry = HTTP_CACHE, None, None
+    if cache is not None:
+        key = cache.key(url, headers)
+        entry = cache.lookup(key)
+        if entry and not revalidate and cache.is_fresh(entry[0]):
+            return _serve_cache_hit(url, entry)
+
+    req_headers = dict(headers or {})
+    if entry:
+        validators = entry[0].get("headers", {})
+        if validators.get("etag"):
+            req_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last-modified"):
+            req_headers["If-Modified-Since"] = validators["last-modified"]
+
+    dbg("[HTTP] GET", {"url": _redact_url(url)})
+    r = SESSION.get(url, headers=req_headers or None, timeout=30)
+    METRICS.incr("http_requests_total", host=host, status=r.status_code)
+    METRICS.observe("http_ttfb_seconds", r.elapsed.total_seconds(), host=host)
+    if r.status_code == 304 and entry:
+        cache.refresh(key, entry[0], r)
+        cache._count("revalidated"); cache._count("bytes_saved", len(entry[1]))
+        METRICS.incr("http_cache_total", result="revalidated")
+        dbg("[HTTP] GET status", {"url": _redact_url(url), "status": 304, "len": len(entry[1]), "cache": "revalidated"})
+        return _cached_response(url, *entry)
+
+    dbg("[HTTP] GET status", {"url": _redact_url(url), "status": r.status_code, "len": len(r.content)})
+    METRICS.incr("http_response_bytes_total", len(r.content), host=host)
+    try:
+        r.raise_for_status()
+    except requests.HTTPError as e:
+        # requests quotes the full URL; keep API keys out of [ERR] logs
+        e.args = (_redact_url(str(e)),)
+        raise
+    if cache is not None:
+        cache._count("misses")
+        METRICS.incr("http_cache_total", result="miss")
+        if r.status_code == 200:
+            cache.store(key, url, r)
+    return r
+
+# Shared thread pools, created on first use and kept for the life of the process.
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+def _executor(kind):
+    with _EXECUTORS_LOCK:
+        if kind not in _EXECUTORS:
+            size = {"browser": 1, "pages": HTTP_POOL_SIZE, "uploads": 4}.get(kind, SOURCE_WORKERS)
+            _EXECUTORS[kind] = ThreadPoolExecutor(max_workers=size, thread_name_prefix=kind)
+        return _EXECUTORS[kind]
+
+# ----------------------- PAGED ASYNC FETCH -----------------------------------
+
+class HostRateLimiter:
+    """
+    Adaptive token bucket per host, shared by every source and thread. A host
+    admits HTTP_HOST_BURST requests back to back, then one per interval
+    (starting at HTTP_HOST_MIN_INTERVAL_S). blocked() on a 403/429 doubles the
+    host's interval (up to HTTP_HOST_MAX_INTERVAL_S) and pauses it for the
+    Retry-After; each success() eases it back toward the base. After
+    HTTP_HOST_BLOCK_LIMIT blocks in a row the host is walled off until
+    new_run(), so a run stops spending requests against it. Sources may
+    declare a slower base for their own hosts (configure()).
+    """
+    def __init__(self, min_interval, burst=1, max_interval=30.0, block_limit=3):
+        self.base = max(0.0, min_interval)
+        self.burst = burst
+        self.max_interval = max(max_interval, self.base)
+        self.block_limit = block_limit
+        self._bases = {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        return self._hosts.setdefault(host, {"interval": self._base(host), "tat": 0.0, "paused_until": 0.0, "streak": 0})
+
+    def _base(self, host):
+        return self._bases.get(host, self.base)
+
+    def configure(self, host, min_interval):
+        """Set host's base spacing (never below the global one); learned slowdowns are kept."""
+        with self._lock:
+            base = min(self.max_interval, max(self.base, min_interval))
+            self._bases[host] = base
+            h = self._host(host)
+            h["interval"] = max(h["interval"], base)
+
+    def reserve(self, host):
+        """Claim the next slot for host; returns seconds to wait before sending."""
+        with self._lock:
+            h, now = self._host(host), time.monotonic()
+            # GCRA form of the bucket: tat is when the bucket would be empty again
+            start = max(now, h["paused_until"], h["tat"] - (self.burst - 1) * h["interval"])
+            h["tat"] = max(h["tat"], start) + h["interval"]
+            return start - now
+
+    def blocked(self, host, pause_s=0.0):
+        with self._lock:
+            h = self._host(host)
+            h["streak"] += 1
+            h["interval"] = min(self.max_interval, max(h["interval"] * 2, 1.0))
+            h["paused_until"] = max(h["paused_until"], time.monotonic() + pause_s)
+        METRICS.incr("http_blocked_total", host=host)
+
+    def success(self, host):
+        with self._lock:
+            h = self._host(host)
+            h["streak"] = 0
+            base = self._base(host)
+            if h["interval"] > base:
+                eased = h["interval"] * 0.7
+                h["interval"] = base if eased < base + 0.1 else eased
+
+    def walled(self, host):
+        with self._lock:
+            return self._host(host)["streak"] >= self.block_limit
+
+    def new_run(self):
+        """Give walled hosts another chance; learned intervals carry over (daemon cycles)."""
+        with self._lock:
+            for h in self._hosts.values():
+                h["streak"] = 0
+
+    def stats(self):
+        """Hosts currently slowed or blocking, for debug.json."""
+        with self._lock:
+            return {host: {"interval_s": round(h["interval"], 2), "block_streak": h["streak"]}
+                    for host, h in self._hosts.items() if h["interval"] > self._base(host) or h["streak"]} or None
+
+HOST_LIMITER = HostRateLimiter(HTTP_HOST_MIN_INTERVAL_S, HTTP_HOST_BURST, HTTP_HOST_MAX_INTERVAL_S, HTTP_HOST_BLOCK_LIMIT)
+
+def _retry_after_s(exc, attempt):
+    resp = getattr(exc, "response", None)
+    ra = resp.headers.get("Retry-After") if resp is not None else None
+    if ra:
+        try:
+            return max(0.0, float(ra))
+        except ValueError:
+            dt = parse_date_guess(ra)
+            if dt:
+                return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+    return HTTP_429_BACKOFF_S * (2 ** attempt)
+
+def _block_status(exc):
+    """403 or 429 when exc is the board refusing us, else None."""
+    resp = getattr(exc, "response", None)
+    return resp.status_code if resp is not None and resp.status_code in (403, 429) else None
+
+def is_block(exc):
+    return isinstance(exc, SourceBlocked) or _block_status(exc) is not None
+
+def _get_in_source_ctx(url, source, cancel, revalidate=False):
+    _SOURCE_CTX.source, _SOURCE_CTX.cancel = source, cancel
+    try:
+        return http_get(url, revalidate=revalidate)
+    finally:
+        _SOURCE_CTX.source, _SOURCE_CTX.cancel = None, None
+
+async def afetch(url, sem, revalidate=False):
+    """
+    Fetch one URL through SESSION on the shared page pool, paced by
+    HOST_LIMITER. 429s back off (Retry-After aware) and retry; 403s slow the
+    host and fail. Raises HostBlocked rather than waiting on a walled-off
+    host or a pause longer than HTTP_HOST_MAX_INTERVAL_S. Fresh cache hits
+    are served up front: only real network requests take a pacing slot.
+    revalidate=True skips that (see http_get).
+    """
+    check_cancelled()
+    hit = None if revalidate else _fresh_cache_hit(url)
+    if hit is not None:
+        return hit
+    loop = asyncio.get_running_loop()
+    host = urlsplit(url).netloc
+    source, cancel = getattr(_SOURCE_CTX, "source", None), getattr(_SOURCE_CTX, "cancel", None)
+    async with sem:
+        for attempt in range(HTTP_429_RETRIES + 1):
+            if HOST_LIMITER.walled(host):
+                raise HostBlocked(f"{host} refused {HOST_LIMITER.block_limit} requests in a row; not fetching {_redact_url(url)}")
+            delay = HOST_LIMITER.reserve(host)
+            if delay > HTTP_HOST_MAX_INTERVAL_S:
+                raise HostBlocked(f"{host} is paused for {delay:.0f}s; not fetching {_redact_url(url)}")
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                r = await loop.run_in_executor(_executor("pages"), _get_in_source_ctx, url, source, cancel,
+                                                 revalidate)
+            except Exception as e:
+                status = _block_status(e)
+                if status is None:
+                    raise
+                wait_s = _retry_after_s(e, attempt)
+                HOST_LIMITER.blocked(host, wait_s)
+                if status == 403 or attempt == HTTP_429_RETRIES or wait_s > HTTP_HOST_MAX_INTERVAL_S:
+                    raise
+                dbg("[HTTP] throttled; backing off", {"host": host, "url": _redact_url(url), "wait_s": round(wait_s, 1)})
+                continue
+            HOST_LIMITER.success(host)
+            return r
+
+async def afetch_pages(urls, revalidate=False):
+    """
+    Async generator of (url, response) in completion order. The first URL is
+    fetched alone (its errors propagate, as a single-page fetch would); the
+    rest run with up to HTTP_PAGE_CONCURRENCY in flight and are skipped on error.
+    revalidate is passed to afetch for every page.
+    """
+    if not urls:
+        return
+    sem = asyncio.Semaphore(HTTP_PAGE_CONCURRENCY)
+    first = urls[0]
+    yield first, await afetch(first, sem, revalidate)
+
+    tasks = {asyncio.ensure_future(afetch(u, sem, revalidate)): u for u in urls[1:]}
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is not None:
+                    dbg("[HTTP] page failed; skipping",
+                        {"url": _redact_url(tasks[t]), "error": _redact_url(str(t.exception()))})
+                    note_partial(f"page failed: {type(t.exception()).__name__}")
+                    continue
+                yield tasks[t], t.result()
+    finally:
+        for t in tasks:
+            t.cancel()
+
+def normalize_text(t):
+    return re.sub(r"\s+"," ", t or "").strip()
+
+# ----------------------- DATE NORMALIZATION ----------------------------------
+# Job boards emit a handful of shapes; those are matched with precompiled
+# patterns and dateutil only sees the rest. Results are memoized per string:
+# absolute dates as datetimes, relative phrases ("3d ago") as offsets applied
+# to `now` on each call, so the memo stays valid as the clock moves. dateutil
+# results are memoized only when the string names a year; "Monday" or "June 3"
+# depend on today and are re-parsed against `now` every time.
+
+_ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?(Z|[+-]\d{2}:?\d{2})?")
+_DMY_RE = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})")
+_REL_UNITS = {
+    **dict.fromkeys(("m", "min", "mins", "minute", "minutes"), timedelta(minutes=1)),
+    **dict.fromkeys(("h", "hr", "hrs", "hour", "hours"), timedelta(hours=1)),
+    **dict.fromkeys(("d", "day", "days"), timedelta(days=1)),
+    **dict.fromkeys(("w", "wk", "wks", "week", "weeks"), timedelta(weeks=1)),
+    **dict.fromkeys(("mo", "mos", "month", "months"), timedelta(days=30)),
+    **dict.fromkeys(("y", "yr", "yrs", "year", "years"), timedelta(days=365)),
+}
+_REL_RE = re.compile(r"(?:(?:listed|posted|active|updated)\s+)?(?:about\s+)?(\d+)\s*\+?\s*("
+                     + "|".join(sorted(_REL_UNITS, key=len, reverse=True)) + r")\b\s*\+?(?:\s+ago)?")
+_TODAY_RE = re.compile(r"(?:(?:listed|posted|active)\s+)?(?:just posted|just now|just|today|now)")
+_YEAR_RE = re.compile(r"(?<!\d)(?:19|20)\d{2}(?!\d)")
+
+def _dateutil_parse(s, now=None):
+    """dateutil fallback, day-first like the dd/mm/yyyy fast path; missing fields come from `now`."""
+    base = (now or UTC_NOW).astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    try:
+        dt = dp.parse(s, dayfirst=True, yearfirst=False, default=base)
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+@functools.lru_cache(maxsize=8192)
+def _parse_date_memo(s):
+    """
+    ("abs", aware datetime) | ("rel", timedelta before now) | ("today", None)
+    for a string dateutil must resolve against today | None, for one stripped string.
+    """
+    m = _ISO_RE.fullmatch(s)
+    if m:
+        iso, off = s, m.group(1)
+        if off == "Z":
+            iso = s[:-1] + "+00:00"
+        elif off and ":" not in off:
+            iso = s[:-2] + ":" + s[-2:]
+        try:
+            dt = datetime.fromisoformat(iso)
+            return "abs", dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    t = " ".join(s.lower().split())
+    m = _DMY_RE.fullmatch(t)
+    if m:
+        try:
+            return "abs", datetime(int(m.group(3)), int(m.group(2)), int(m.group(1)), tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    if _TODAY_RE.fullmatch(t):
+        return "rel", timedelta(0)
+    if t == "yesterday":
+        return "rel", timedelta(days=1)
+    m = _REL_RE.fullmatch(t)
+    if m:
+        return "rel", int(m.group(1)) * _REL_UNITS[m.group(2)]
+    dt = _dateutil_parse(s)
+    if dt is None:
+        return None
+    return ("abs", dt) if _YEAR_RE.search(t) else ("today", None)
+
+def parse_date_guess(s, now=None):
+    """
+    Aware datetime for a board date string, or None. Handles ISO 8601,
+    dd/mm/yyyy, "today"/"just posted"/"yesterday" and relative phrases
+    ("Listed 3 days ago", "30d+ ago", "5h ago"; measured back from `now`,
+    default UTC_NOW), then falls back to dateutil.
+    """
+    if not s or not isinstance(s, str):
+        return None
+    hit = _parse_date_memo(s.strip())
+    if hit is None:
+        return None
+    kind, v = hit
+    if kind == "today":
+        return _dateutil_parse(s.strip(), now)
+    return v if kind == "abs" else (now or UTC_NOW) - v
+
+def parse_dates_column(values, now=None):
+    """
+    A column of datetimes / date strings / None -> tz-aware UTC datetime64
+    Series. Each distinct value is parsed once, then broadcast back by code.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return pd.to_datetime(values, utc=True)
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series([as_datetime(u, now) for u in uniques], dtype=object), utc=True, errors="coerce")
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=values.index)
+
+def in_sydney_scope(city_text):
+    t = (city_text or "").lower()
+    return "sydney" in t or "nsw" in t or "australia" in t
+
+# ----------------------- KEYWORD MATCHER -------------------------------------
+
+TITLE_TERMS = [
+    "head of data","head of analytics","head of data & analytics","director of data","director of analytics",
+    "head of bi","head of insights","head of data platform","director of insights","data transformation","chief data officer","cdo"
+]
+CONTRACT_TERMS = ["contract", "day rate", "daily rate", "contractor"]
+
+def _trie_regex(terms):
+    """Regex source for a literal set, factored into a prefix trie so shared prefixes are tried once."""
+    trie = {}
+    for t in terms:
+        node = trie
+        for ch in t:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class TermMatcher:
+    """
+    Every keyword set compiled once into one term table, so a document is
+    lowercased once and all categories come back together with the terms that
+    matched. Semantics are plain substring containment, as the per-function
+    `term in text` checks this replaces. For small sets C-level substring search
+    per term beats any Python-level pass; from REGEX_MIN_TERMS terms up the set
+    is scanned in a single pass with a trie regex instead (lookahead finds the
+    longest term at every offset, shorter terms it starts with are credited too).
+    """
+    REGEX_MIN_TERMS = 64
+
+    def __init__(self, categories):
+        self.categories = {cat: [t for t in dict.fromkeys(terms) if t] for cat, terms in categories.items()}
+        self._terms = list(dict.fromkeys(t for terms in self.categories.values() for t in terms))
+        self._subsets = {}
+        self._rx = None
+        if len(self._terms) >= self.REGEX_MIN_TERMS:
+            self._prefixes = {t: [u for u in self._terms if t.startswith(u)] for t in self._terms}
+            self._rx = re.compile("(?=(" + _trie_regex(self._terms) + "))")
+
+    def _terms_for(self, cats):
+        if cats not in self._subsets:
+            self._subsets[cats] = list(dict.fromkeys(t for c in cats for t in self.categories[c]))
+        return self._subsets[cats]
+
+    def scan(self, text, cats=None):
+        """
+        Return {category: [matched terms, in the category's own order]} for
+        every category, or only for `cats` (a tuple) when given.
+        """
+        cats = tuple(cats) if cats else tuple(self.categories)
+        t = (text or "").lower()
+        if not t:
+            found = set()
+        elif self._rx is not None:
+            found = set()
+            for m in self._rx.finditer(t):
+                if m.group(1):
+                    found.update(self._prefixes[m.group(1)])
+        else:
+            found = {term for term in self._terms_for(cats) if term in t}
+        return {cat: [x for x in self.categories[cat] if x in found] if cat in cats else [] for cat in self.categories}
+
+    def frames(self, s, cats=None):
+        """
+        Column form of scan() for a Series of texts: {category: boolean frame,
+        one column per term in the category's own order}.
+        """
+        cats = tuple(cats) if cats else tuple(self.categories)
+        low = s.fillna("").str.lower()
+        return {cat: pd.DataFrame({t: low.str.contains(t, regex=False).fillna(False).astype(bool)
+                                   for t in self.categories[cat]}, index=s.index)
+                for cat in cats}
+
+MATCHER = TermMatcher({
+    "title": TITLE_TERMS,
+    "tech": ALIGNMENT_TECH_PREF,
+    "sector": SECTOR_PRIORITY,
+    "contract": CONTRACT_TERMS,
+})
+
+# Categories worth looking for in each kind of text
+TITLE_CATS = ("title", "tech", "contract")
+BODY_CATS = ("tech", "sector", "contract")
+
+def title_hits(title):
+    return bool(MATCHER.scan(title, ("title",))["title"])
+
+def engagement_type(title_or_body, hits=None):
+    hits = hits if hits is not None else MATCHER.scan(title_or_body, ("contract",))
+    return "Contract" if hits["contract"] else "Permanent"
+
+def row(role, company, source_url, posted_dt, engagement, status, sector, rationale, score):
+    """
+    One listing. Values stay typed (Posting Date is a datetime, score may be
+    None until score_frame runs); format_report() does display formatting.
+    rationale is the source's note; score_frame appends the matched terms.
+    """
+    return {
+        "Role": role,
+        "Company/Agency": company,
+        "Source (with link)": source_url,
+        "Posting Date": posted_dt,
+        "Engagement Type (Perm/Contract)": engagement,
+        "Status (Active/Closed)": status,
+        "Sector": sector,
+        "Rationale (why it fits)": rationale,
+        "Alignment Score (1–10)": score,
+        "_note": rationale,
+    }
+
+def as_datetime(v, now=None):
+    """Posting Date as an aware datetime, whether typed or a string from older state rows."""
+    if isinstance(v, datetime):
+        return v if v.tzinfo else v.replace(tzinfo=timezone.utc)
+    return parse_date_guess(v, now) if isinstance(v, str) else None
+
+# ----------------------- BATCH SCORING ---------------------------------------
+
+SCORE_COL = "Alignment Score (1–10)"
+DATE_COL = "Posting Date"
+
+def _text_dtype():
+    # Arrow-backed strings make .str.contains a C kernel; fall back to object
+    try:
+        import pyarrow  # noqa: F401
+        return "string[pyarrow]"
+    except ImportError:
+        return object
+
+def listings_frame(rows):
+    """Collected rows -> columnar frame with a tz-aware datetime date, nullable int score and text body."""
+    df = pd.DataFrame(rows)
+    for col in ("Role", "Company/Agency", "Source (with link)", DATE_COL, "Engagement Type (Perm/Contract)",
+                "Status (Active/Closed)", "Sector", "Rationale (why it fits)", SCORE_COL, "_note", "_body"):
+        if col not in df.columns:
+            df[col] = None
+    df[DATE_COL] = parse_dates_column(df[DATE_COL])
+    df[SCORE_COL] = pd.to_numeric(df[SCORE_COL], errors="coerce").astype("Int64")
+    df["_note"] = df["_note"].fillna(df["Rationale (why it fits)"]).fillna("")
+    df["Also Listed At"] = df["Also Listed At"].fillna("") if "Also Listed At" in df.columns else ""
+    df["_body"] = df["_body"].fillna("").astype(_text_dtype())
+    return df
+
+def _joined(hits: pd.DataFrame):
+    """Comma-joined names of the True columns in each row, without a per-row Python loop."""
+    if hits.shape[1] == 0:
+        return pd.Series("", index=hits.index)
+    return hits.astype(object).dot(pd.Index([f"{t}, " for t in hits.columns])).str.rstrip(", ")
+
+@timed("score")
+def score_frame(df, tech_pref=None, sector_priority=None, since=None):
+    """
+    Score every row in one pass of column operations over MATCHER's term sets
+    (TermMatcher.frames): +3 title term, +weight per tech term in title or body (tech_pref may be a
+    list, weight 2 each, or a {term: weight} dict), +2 priority sector in the
+    body, +2 posted since `since`; clipped to 1..10. Also fills Sector,
+    Engagement Type and the Rationale with the terms that matched.
+    Defaults are the configured ALIGNMENT_TECH_PREF / SECTOR_PRIORITY / SINCE.
+    """
+    if df.empty:
+        return df
+    tech_pref = ALIGNMENT_TECH_PREF if tech_pref is None else tech_pref
+    weights = dict(tech_pref) if isinstance(tech_pref, dict) else {t: 2 for t in tech_pref}
+    weights = {t.lower(): w for t, w in weights.items() if t}
+    sectors = [s.lower() for s in (SECTOR_PRIORITY if sector_priority is None else sector_priority) if s]
+    since = SINCE if since is None else since
+
+    matcher = MATCHER
+    if tech_pref is not ALIGNMENT_TECH_PREF or sectors != MATCHER.categories["sector"]:
+        matcher = TermMatcher(dict(MATCHER.categories, tech=list(weights), sector=sectors))
+
+    dtype = _text_dtype()
+    t_hits = matcher.frames(df["Role"].astype(dtype), TITLE_CATS)
+    b_hits = matcher.frames(df["_body"].astype(dtype), BODY_CATS)
+    title_terms = t_hits["title"]
+    tech = t_hits["tech"] | b_hits["tech"]
+    sector_hits = b_hits["sector"]
+    contract = t_hits["contract"] | b_hits["contract"]
+
+    title_hit = title_terms.any(axis=1)
+    tech_score = (tech * pd.Series(weights, dtype=float)).sum(axis=1) if weights else 0
+    # first priority sector present wins
+    sector = pd.Series("edge-case/other", index=df.index, dtype=object)
+    for s in reversed(sectors):
+        sector = sector.mask(sector_hits[s], s)
+    recent = df[DATE_COL].notna() & (df[DATE_COL] >= pd.Timestamp(since))
+
+    score = 3 * title_hit + tech_score + 2 * (sector != "edge-case/other") + 2 * recent
+    out = df.copy()
+    out[SCORE_COL] = pd.Series(score, index=df.index).clip(1, 10).round().astype("Int64")
+    out["Sector"] = sector
+    out["Engagement Type (Perm/Contract)"] = contract.any(axis=1).map({True: "Contract", False: "Permanent"})
+
+    parts = pd.DataFrame({
+        "title": _joined(title_terms), "tech": _joined(tech), "sector": sector.where(sector != "edge-case/other", ""),
+        "contract terms": _joined(contract),
+    }, index=df.index)
+    why = pd.Series("", index=df.index, dtype=object)
+    for label in parts.columns:
+        piece = (label + ": " + parts[label]).where(parts[label] != "", "")
+        why = why.str.cat(piece, sep="; ").str.strip("; ")
+    note = df["_note"].fillna("").astype(object)
+    out["Rationale (why it fits)"] = note.str.cat(why, sep="; ").str.strip("; ")
+    return out
+
+@timed("sort")
+def rank_frame(df):
+    """Score desc, then newest first — on the typed columns, no string round-trips."""
+    if df.empty:
+        return df
+    return df.sort_values(by=[SCORE_COL, DATE_COL], ascending=[False, False], na_position="last", kind="stable")
+
+def format_report(df):
+    """Display formatting for the report only: dates as YYYY-MM-DD, internal columns dropped."""
+    out = report_columns(df)
+    if not out.empty:
+        out = out.copy()
+        out[DATE_COL] = out[DATE_COL].dt.strftime("%Y-%m-%d").fillna("")
+    return out
+
+# ----------------------- HTML PARSING ----------------------------------------
+
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.I | re.S)
+_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+
+def response_html(r):
+    """
+    Response body as text, decoded with the declared charset or UTF-8.
+    Skips r.text, which runs charset detection over the whole body when the
+    server does not declare one.
+    """
+    m = _CHARSET_RE.search(r.headers.get("Content-Type", ""))
+    try:
+        return r.content.decode(m.group(1) if m else "utf-8", errors="replace")
+    except LookupError:
+        return r.text
+
+def _soup_features():
+    """bs4 tree builder: lxml's C parser when installed, else the stdlib one."""
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+class _SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parse = LexborHTMLParser
+
+    def anchors(self, html, href_contains):
+        css = ", ".join(f"a[href*='{s}']" for s in href_contains)
+        return [(a.text(deep=True), a.attributes.get("href") or "") for a in self._parse(html).css(css)]
+
+class _LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self._html = lxml.html
+        self._parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def anchors(self, html, href_contains):
+        # bytes + explicit encoding: lxml rejects str input that carries an XML encoding declaration
+        doc = self._html.document_fromstring(html.encode("utf-8"), parser=self._parser)
+        cond = " or ".join(f"contains(@href, '{s}')" for s in href_contains)
+        return [(a.text_content(), a.get("href") or "") for a in doc.xpath(f"//a[{cond}]")]
+
+class _SoupBackend:
+    """Pure bs4 fallback: SoupStrainer builds only the matching <a> tags instead of the whole tree."""
+    name = "soup"
+
+    def __init__(self):
+        from bs4 import SoupStrainer
+        self._strainer = SoupStrainer
+
+    def anchors(self, html, href_contains):
+        wanted = lambda h: bool(h) and any(s in h for s in href_contains)
+        soup = BeautifulSoup(html, "html.parser", parse_only=self._strainer("a", href=wanted))
+        return [(a.get_text(), a.get("href", "")) for a in soup.find_all("a", href=wanted)]
+
+HTML_BACKENDS = {"selectolax": _SelectolaxBackend, "lxml": _LxmlBackend, "soup": _SoupBackend}
+
+@functools.lru_cache(maxsize=None)
+def html_backend(name=None):
+    """
+    Listing-page parser: `name` (default HTML_PARSER) if importable, otherwise
+    the first importable one in HTML_BACKENDS order. "auto" means fastest first.
+    """
+    name = name or HTML_PARSER
+    if name not in HTML_BACKENDS and name != "auto":
+        dbg("[HTML] unknown HTML_PARSER; using auto", {"HTML_PARSER": name})
+        name = "auto"
+    order = list(HTML_BACKENDS) if name == "auto" else [name] + [n for n in HTML_BACKENDS if n != name]
+    for n in order:
+        try:
+            backend = HTML_BACKENDS[n]()
+        except ImportError:
+            continue
+        if n != order[0]:
+            dbg("[HTML] parser backend unavailable; falling back", {"wanted": order[0], "using": n})
+        return backend
+    raise RuntimeError("no HTML parser backend available")
+
+def select_anchors(html, href_contains, source=None, backend=None):
+    """
+    (text, href) of every <a> whose href contains any of `href_contains`, in
+    document order. Script/style blocks (inline JSON state, CSS) are cut
+    before parsing since they never hold listing links.
+    Returns (anchors, parse_ms); parse time also lands in METRICS.
+    """
+    b = backend or html_backend()
+    t0 = time.perf_counter()
+    html = _SCRIPT_STYLE_RE.sub("", html or "")
+    out = b.anchors(html, href_contains) if html.strip() else []
+    secs = time.perf_counter() - t0
+    METRICS.observe("span_seconds", secs, span="html_parse", backend=b.name, source=source or "unknown")
+    return out, round(secs * 1000, 2)
+
+# ----------------------- SOURCE PLUGINS --------------------------------------
+# A source yields raw listings and declares what it can do; collect_source()
+# turns them into rows the same way for every board (title filter, window,
+# row(), max_results), and run_sources() schedules them by their capabilities.
+
+class Source(ABC):
+    """
+    Base for job-board plugins. listings() yields raw dicts with "title" and
+    "href" plus any of "company", "posted" (datetime or board text),
+    "location" and "body". HTTP sources write it as an async generator over
+    afetch_pages (shared page pool, HOST_LIMITER, HTTP cache); blocking
+    drivers such as Playwright's sync API use a plain generator instead.
+    A subclass missing an abstract method can't be instantiated, so a
+    half-written plugin fails at registration rather than mid-run.
+    """
+    key = ""
+    base_url = ""                  # prefix for relative hrefs
+    placeholder_company = ""       # company when the listing has none
+    rationale = "Sydney search"
+    paginated = False
+    detail_pages = False           # hrefs are job pages enrich_rows() can parse
+    browser = False                # runs on the browser worker
+    min_interval_s = None          # per-host spacing; None keeps HTTP_HOST_MIN_INTERVAL_S
+    max_results = None
+
+    def configured(self):
+        """False when required settings are missing; the run then skips the source."""
+        return True
+
+    def hosts(self):
+        return [urlsplit(self.base_url).netloc] if self.base_url else []
+
+    def capabilities(self):
+        return {"paginated": self.paginated, "detail_pages": self.detail_pages, "browser": self.browser,
+                "min_interval_s": self.min_interval_s, "max_results": self.max_results}
+
+    @abstractmethod
+    def listings(self):
+        """Raw listing dicts, as an async or a plain generator."""
+
+    def to_row(self, raw):
+        """Report row for one raw listing, or None when it misses the title filter or window."""
+        title = normalize_text(raw.get("title"))
+        href = raw.get("href") or ""
+        if not title or not href:
+            return None
+        t_hits = MATCHER.scan(title, TITLE_CATS)
+        if not t_hits["title"]:
+            return None
+        listed_dt = as_datetime(raw.get("posted"))
+        posted_dt = listed_dt or UTC_NOW  # undated listings count as fresh
+        full = self.base_url + href if href.startswith("/") else href
+        r = row(title, normalize_text(raw.get("company")) or self.placeholder_company, full, posted_dt,
+                engagement_type(title, t_hits), "Active", "edge-case/other", self.rationale, None)
+        if posted_dt < SINCE:
+            note_aged_out(job_key(r))
+            return None
+        r["_dated"] = listed_dt is not None
+        if raw.get("location"):
+            r["_location"] = normalize_text(raw["location"])
+        if not self.detail_pages:
+            # Nothing to fetch later: the listing's own description is the body
+            r["_body"] = normalize_text(raw.get("body"))[:ENRICH_BODY_MAX_CHARS]
+            if r["_body"]:
+                r["_note"] = f"{r['_note']}; scored on listing description"
+            r["_enriched"] = True
+        return r
+
+class HttpSource(Source):
+    """Paginated HTML search results: page_urls() fetched via afetch_pages, parse_page() per page."""
+    paginated = True
+    detail_pages = True
+
+    @abstractmethod
+    def page_urls(self):
+        """Search result page URLs, first page first."""
+
+    @abstractmethod
+    def parse_page(self, html):
+        """Raw listing dicts from one result page's HTML."""
+
+    async def listings(self):
+        urls = self.page_urls()
+        dbg(f"[{self.key.upper()}] fetch begin", {"url": urls[0], "pages": len(urls)})
+        # aclosing: a consumer stopping early (max_results) still cancels the page fetches
+        async with aclosing(afetch_pages(urls, HTTP_REVALIDATE_LISTINGS)) as pages:
+            async for url, r in pages:
+                for raw in self.parse_page(response_html(r)):
+                    yield raw
+
+def collect_source(src):
+    """Rows from one source's listings, capped at its max_results; runs async sources on a private loop."""
+    if src.min_interval_s is not None:
+        for host in src.hosts():
+            HOST_LIMITER.configure(host, src.min_interval_s)
+    out, seen = [], 0
+
+    def take(raw):
+        nonlocal seen
+        check_cancelled()
+        seen += 1
+        r = src.to_row(raw)
+        if r is not None:
+            out.append(r)
+        if src.max_results is not None and len(out) >= src.max_results:
+            dbg(f"[{src.key.upper()}] max results reached", {"max": src.max_results})
+            note_partial(f"stopped at max_results={src.max_results}")
+            return True
+        return False
+
+    it = src.listings()
+    if inspect.isasyncgen(it):
+        async def drain():
+            try:
+                async for raw in it:
+                    if take(raw):
+                        break
+            finally:
+                await it.aclose()
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(drain())
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+    else:
+        try:
+            for raw in it:
+                if take(raw):
+                    break
+        finally:
+            it.close()
+    METRICS.incr("source_listings_total", seen, source=src.key)
+    dbg(f"[{src.key.upper()}] final rows", {"count": len(out), "listings": seen})
+    return out
+
+# Overridable (keep a query string; pages append &page= / &start=) to run against bench/bench.py --serve
+SEEK_SEARCH_URL = os.getenv("SEEK_SEARCH_URL") or ("https://www.seek.com.au/jobs"
+                   "?where=Sydney&keywords=head%20of%20data%20OR%20head%20of%20analytics%20"
+                   "OR%20director%20of%20data%20OR%20director%20of%20analytics")
+INDEED_SEARCH_URL = os.getenv("INDEED_SEARCH_URL") or ("https://au.indeed.com/jobs"
+                     "?q=head+of+data+OR+head+of+analytics+OR+director+of+data+OR+director+of+analytics"
+                     "&l=Sydney+NSW")
+
+def _seek_page_url(page):
+    return SEEK_SEARCH_URL if page == 1 else f"{SEEK_SEARCH_URL}&page={page}"
+
+def _indeed_page_url(page):
+    return INDEED_SEARCH_URL if page == 1 else f"{INDEED_SEARCH_URL}&start={(page - 1) * 10}"
+
+class SeekSource(HttpSource):
+    key = "seek"
+    base_url = "https://www.seek.com.au"
+    placeholder_company = "Seek Listing"
+    max_results = SEEK_MAX_RESULTS
+
+    def page_urls(self):
+        return [_seek_page_url(p) for p in range(1, SEEK_MAX_PAGES + 1)]
+
+    def parse_page(self, html):
+        anchors, parse_ms = select_anchors(html, ("/job/",), source=self.key)
+        dbg("[SEEK] raw anchors", {"count": len(anchors), "parse_ms": parse_ms, "backend": html_backend().name})
+        for text, href in anchors:
+            yield {"title": text, "href": href}
+
+class IndeedSource(HttpSource):
+    key = "indeed"
+    base_url = "https://au.indeed.com"
+    placeholder_company = "Indeed Listing"
+    max_results = INDEED_MAX_RESULTS
+
+    def page_urls(self):
+        return [_indeed_page_url(p) for p in range(1, INDEED_MAX_PAGES + 1)]
+
+    def parse_page(self, html):
+        cards, parse_ms = select_anchors(html, ("/pagead/", "/viewjob"), source=self.key)
+        dbg("[INDEED] raw anchors", {"count": len(cards), "parse_ms": parse_ms, "backend": html_backend().name})
+        for text, href in cards:
+            yield {"title": text, "href": href}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+class AdzunaSource(Source):
+    """
+    Adzuna's search API: JSON pages carrying company, created date, location
+    and a description snippet, so rows need no detail fetch.
+    """
+    key = "adzuna"
+    placeholder_company = "Adzuna Listing"
+    rationale = "Adzuna API search"
+    paginated = True
+    min_interval_s = ADZUNA_MIN_INTERVAL_S
+    max_results = ADZUNA_MAX_RESULTS
+
+    def configured(self):
+        return bool(ADZUNA_APP_ID and ADZUNA_APP_KEY)
+
+    def hosts(self):
+        return [urlsplit(ADZUNA_API_URL).netloc]
+
+    def page_urls(self):
+        query = urlencode({"app_id": ADZUNA_APP_ID, "app_key": ADZUNA_APP_KEY, "what_or": ADZUNA_QUERY,
+                           "where": ADZUNA_WHERE, "results_per_page": 50,
+                           "max_days_old": TIME_WINDOW_DAYS, "content-type": "application/json"})
+        return [f"{ADZUNA_API_URL}/{p}?{query}" for p in range(1, ADZUNA_MAX_PAGES + 1)]
+
+    async def listings(self):
+        urls = self.page_urls()
+        dbg("[ADZUNA] fetch begin", {"url": ADZUNA_API_URL, "pages": len(urls)})
+        async with aclosing(afetch_pages(urls, HTTP_REVALIDATE_LISTINGS)) as pages:
+            async for url, r in pages:
+                results = r.json().get("results") or []
+                dbg("[ADZUNA] page", {"url": url.split("?")[0], "results": len(results)})
+                for it in results:
+                    yield {"title": _TAG_RE.sub("", it.get("title") or ""),
+                           "href": it.get("redirect_url"),
+                           "company": (it.get("company") or {}).get("display_name"),
+                           "posted": it.get("created"),
+                           "location": (it.get("location") or {}).get("display_name"),
+                           "body": _TAG_RE.sub(" ", it.get("description") or "")}
+
+def parse_seek_page(html):
+    """Matching listing rows from one SEEK search-results page."""
+    src = SOURCE_REGISTRY["seek"]
+    return (r for raw in src.parse_page(html) if (r := src.to_row(raw)) is not None)
+
+def parse_indeed_page(html):
+    """Matching listing rows from one Indeed search-results page."""
+    src = SOURCE_REGISTRY["indeed"]
+    return (r for raw in src.parse_page(html) if (r := src.to_row(raw)) is not None)
+
+def _report_folder():
+    return f"{REPORT_PREFIX}/{UTC_NOW.strftime('%Y-%m-%d')}"
+
+# ----------------------- BROWSER POOL ----------------------------------------
+
+_BROWSER_UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+
+class BrowserPool:
+    """
+    One Chromium per process, launched on first use and handed out as pages.
+    Contexts are kept warm and reused (up to max_contexts idle) instead of
+    relaunching the browser per scraper. Playwright's sync API is thread-bound,
+    so the pool belongs to the thread that first uses it — the browser worker
+    (see Source.browser / _executor("browser")).
+    """
+    def __init__(self, block_resources=(), max_contexts=2):
+        self.block_resources = set(block_resources)
+        self.max_contexts = max_contexts
+        self._pw = None
+        self._browser = None
+        self._owner = None
+        self._idle = []
+        self.launches = 0
+
+    def _ensure(self):
+        if self._owner is not None and self._owner != threading.get_ident():
+            raise RuntimeError("BrowserPool used from a thread other than its owner")
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        from playwright.sync_api import sync_playwright
+        if self._pw is None:
+            self._pw = sync_playwright().start()
+            self._owner = threading.get_ident()
+        t0 = time.monotonic()
+        METRICS.incr("browser_launches_total")
+        self._browser = self._pw.chromium.launch(headless=True, args=[
+            "--disable-blink-features=AutomationControlled",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+        ])
+        self._idle = []
+        self.launches += 1
+        dbg("[BROWSER] launched", {"secs": round(time.monotonic() - t0, 2), "launches": self.launches,
+                                   "block": sorted(self.block_resources)})
+        return self._browser
+
+    def _route(self, route):
+        if route.request.resource_type in self.block_resources:
+            return route.abort()
+        return route.continue_()
+
+    def _new_context(self):
+        ctx = self._ensure().new_context(
+            user_agent=_BROWSER_UA,
+            locale="en-AU",
+            viewport={"width": 1380, "height": 1800},
+        )
+        if self.block_resources:
+            ctx.route("**/*", self._route)
+        return ctx
+
+    @contextmanager
+    def page(self):
+        """Yield a fresh page in a pooled context; the page is closed afterwards."""
+        self._ensure()
+        ctx = self._idle.pop() if self._idle else self._new_context()
+        pg = ctx.new_page()
+        healthy = True
+        try:
+            yield pg
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            try:
+                pg.close()
+            except Exception:
+                healthy = False
+            if healthy and len(self._idle) < self.max_contexts:
+                self._idle.append(ctx)
+            else:
+                try:
+                    ctx.close()
+                except Exception:
+                    pass
+
+    def close(self):
+        for ctx in self._idle:
+            try:
+                ctx.close()
+            except Exception:
+                pass
+        self._idle = []
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+        if self._pw is not None:
+            self._pw.stop()
+        self._browser = self._pw = self._owner = None
+
+def _block_resources_from_env():
+    v = os.getenv("BROWSER_BLOCK_RESOURCES", "").strip().lower()
+    if v in ("", "0", "false", "no"):
+        return ()
+    if v in ("1", "true", "yes"):
+        return ("image", "font", "media")
+    return tuple(s.strip() for s in v.split(",") if s.strip())
+
+BROWSER_POOL = BrowserPool(block_resources=_block_resources_from_env(),
+                           max_contexts=int(os.getenv("BROWSER_MAX_CONTEXTS", "2")))
+
+def close_browser_pool():
+    """Shut the pooled browser down on its own worker thread."""
+    if BROWSER_POOL._browser is None and BROWSER_POOL._pw is None:
+        return
+    try:
+        _executor("browser").submit(BROWSER_POOL.close).result(timeout=30)
+    except Exception as e:
+        dbg("[BROWSER] close failed", str(e))
+
+def _upload_screenshot(page, reason):
+    try:
+        png = page.screenshot(full_page=True)
+        upload_with_msi(png, f"{_report_folder()}/seek_screenshot.png", content_type="image/png")
+        dbg("[SEEK/DIRECT] screenshot uploaded", {"reason": reason})
+    except Exception as e:
+        dbg("[SEEK/DIRECT] screenshot upload failed", str(e))
+
+# Card fields pulled by every extraction mode. Keys map to the data-automation
+# hooks SEEK uses; title falls back to the first job link's text.
+_SEEK_CARD_FIELDS = {
+    "title": "[data-automation='jobTitle']",
+    "company": "[data-automation='jobCompany']",
+    "location": "[data-automation='jobLocation']",
+    "listed": "[data-automation='jobListingDate']",
+}
+_SEEK_JOB_LINK = "a[href*='/job/']"
+
+_EXTRACT_CARDS_JS = """
+([sel, limit, fields, link]) => {
+  const txt = (el) => el ? (el.innerText || el.textContent || "").trim() : "";
+  return Array.from(document.querySelectorAll(sel)).slice(0, limit).map((card) => {
+    const a = card.querySelector(link);
+    const out = {href: a ? (a.getAttribute("href") || "") : ""};
+    for (const [k, css] of Object.entries(fields)) out[k] = txt(card.querySelector(css));
+    if (!out.title) out.title = txt(a);
+    return out;
+  });
+}
+"""
+
+def _extract_cards_evaluate(page, sel, limit):
+    """All cards in one browser round-trip."""
+    return page.evaluate(_EXTRACT_CARDS_JS, [sel, limit, _SEEK_CARD_FIELDS, _SEEK_JOB_LINK])
+
+def _extract_cards_snapshot(page, sel, limit):
+    """One HTML snapshot, parsed locally."""
+    soup = BeautifulSoup(page.content(), _soup_features())
+    cards = []
+    for card in soup.select(sel)[:limit]:
+        a = card.select_one(_SEEK_JOB_LINK)
+        c = {k: normalize_text(el.get_text()) if (el := card.select_one(css)) else ""
+             for k, css in _SEEK_CARD_FIELDS.items()}
+        c["href"] = a.get("href", "") if a else ""
+        if not c["title"] and a:
+            c["title"] = normalize_text(a.get_text())
+        cards.append(c)
+    return cards
+
+def _extract_cards_locator(page, sel, limit):
+    """Per-card locator calls; slow (several round-trips per card) but the most tolerant."""
+    cards = []
+    for i in range(limit):
+        if is_cancelled():
+            dbg("[SEEK/DIRECT] cancelled mid-extraction", {"parsed": i})
+            break
+        try:
+            card = page.locator(sel).nth(i)
+
+            # title
+            title = ""
+            try:
+                title = card.locator(_SEEK_CARD_FIELDS["title"]).inner_text(timeout=1800).strip()
+            except Exception:
+                links = card.locator(_SEEK_JOB_LINK)
+                if links.count() > 0:
+                    title = (links.first.inner_text(timeout=1200) or "").strip()
+            if not title or not title_hits(title):
+                continue
+
+            # href
+            href = ""
+            try:
+                href = card.locator(_SEEK_JOB_LINK).first.get_attribute("href") or ""
+            except Exception:
+                pass
+            if not href:
+                continue
+
+            c = {"title": title, "href": href}
+            for k in ("company", "location", "listed"):
+                try:
+                    c[k] = (card.locator(_SEEK_CARD_FIELDS[k]).inner_text(timeout=1200) or "").strip()
+                except Exception:
+                    c[k] = ""
+            cards.append(c)
+        except Exception:
+            continue
+    return cards
+
+SEEK_DIRECT_STATS = {}  # extraction mode/timing of the last seek_direct run, for debug.json
+
+class SeekDirectSource(Source):
+    """
+    A *full* SEEK search URL (SEEK_URL) loaded via Playwright, parsed from the
+    listing cards. If blocked/empty, uploads seek_screenshot.png to the report
+    folder for diagnosis.
+    """
+    key = "seek_direct"
+    base_url = "https://www.seek.com.au"
+    placeholder_company = "Seek Listing"
+    rationale = "SEEK search URL"
+    detail_pages = True
+    browser = True
+    max_results = SEEK_DIRECT_MAX_CARDS
+
+    def configured(self):
+        return bool(SEEK_URL)
+
+    def listings(self):
+        # A plain generator: Playwright's sync API can't run inside collect_source's event loop
+        try:
+            from playwright.sync_api import TimeoutError as PWTimeout
+        except ModuleNotFoundError as e:
+            dbg("[SEEK/DIRECT] Playwright not installed in image", str(e))
+            raise
+
+        dbg("[SEEK/DIRECT] fetch begin", {"url": SEEK_URL})
+        SEEK_DIRECT_STATS.clear()
+        with BROWSER_POOL.page() as page:
+            yield from self._cards(page, PWTimeout)
+
+    def _cards(self, page, PWTimeout):
+        try:
+            with span("browser_goto", source="seek_direct"):
+                page.goto(SEEK_URL, wait_until="domcontentloaded", timeout=60000)
+        except PWTimeout:
+            dbg("[SEEK/DIRECT] timeout on goto")
+            _upload_screenshot(page, "goto timeout")
+            raise SourceBlocked("seek_direct: timeout on goto")
+
+        # Try cookie/consent popups
+        try:
+            page.get_by_role("button", name=re.compile("accept|agree|got it|okay|ok", re.I)).click(timeout=2500)
+        except Exception:
+            pass
+
+        # Basic anti-bot: small wait + scroll
+        page.wait_for_timeout(1000 + random.randint(0, 1200))
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        page.wait_for_timeout(1200)
+
+        # Candidate job-card selectors
+        card_sel_variants = [
+            "article[data-automation='normalJob']",
+            "[data-automation='job-card']",
+            "article",  # fallback
+        ]
+        job_cards = None
+        for sel in card_sel_variants:
+            try:
+                count = page.locator(sel).count()
+                if count > 0:
+                    job_cards = (sel, count)
+                    break
+            except Exception:
+                continue
+
+        if not job_cards:
+            dbg("[SEEK/DIRECT] no cards found; uploading screenshot")
+            _upload_screenshot(page, "no cards")
+            raise SourceBlocked("seek_direct: no job cards (bot wall or layout change)")
+
+        sel, count = job_cards
+        dbg("[SEEK/DIRECT] card selector", {"selector": sel, "count": count})
+
+        limit = min(count, SEEK_DIRECT_MAX_CARDS)
+        if count > limit:
+            note_partial(f"read {limit} of {count} cards")
+        t0 = time.monotonic()
+        mode, cards = SEEK_DIRECT_EXTRACT, []
+        if mode in ("evaluate", "snapshot"):
+            try:
+                cards = (_extract_cards_evaluate if mode == "evaluate" else _extract_cards_snapshot)(page, sel, limit)
+            except Exception as e:
+                dbg(f"[SEEK/DIRECT] {mode} extraction failed; falling back to locators", str(e))
+            if not any(c["title"] and c["href"] for c in cards):
+                mode, cards = "locator", []
+        if not cards:
+            mode, cards = "locator", _extract_cards_locator(page, sel, limit)
+        extract_ms = round((time.monotonic() - t0) * 1000, 1)
+        METRICS.observe("span_seconds", extract_ms / 1000, span="card_extract", mode=mode)
+        SEEK_DIRECT_STATS.update({"extract_mode": mode, "extract_ms": extract_ms,
+                                  "cards_seen": count, "cards_extracted": len(cards)})
+        dbg("[SEEK/DIRECT] extracted cards", SEEK_DIRECT_STATS)
+
+        # card date: "2d ago", "Listed 3 days ago", "Just posted"; unreadable means fresh
+        raws = [{"title": c["title"], "href": c["href"], "company": c["company"],
+                 "posted": c["listed"], "location": c.get("location")} for c in cards]
+        yield from raws
+
+        if not any(self.to_row(raw) for raw in raws):
+            # Page loaded but nothing matched; capture the same page for inspection
+            _upload_screenshot(page, "no matching rows")
+
+# ----------------------------------------------------------------------------
+
+# Selectable via SOURCES, run in this order. Sources that drive a browser
+# (browser=True) run on their own single worker thread so Playwright's
+# thread-bound objects never mix with the HTTP worker pool.
+SOURCE_REGISTRY = {}
+
+def register_source(src):
+    if not src.key:
+        raise ValueError(f"{type(src).__name__} has no key")
+    SOURCE_REGISTRY[src.key] = src
+    return src
+
+for _src in (SeekSource(), IndeedSource(), SeekDirectSource(), AdzunaSource()):
+    register_source(_src)
+
+# ----------------------- CIRCUIT BREAKER -------------------------------------
+
+class CircuitBreakers:
+    """
+    Per-source breakers persisted as JSON at BREAKER_PATH, so they span runs
+    and daemon cycles. A source whose run ends blocked (403/429 walls, a bot
+    page, a deadline timeout) BREAKER_THRESHOLD times in a row opens and is
+    skipped for a cooldown (BREAKER_COOLDOWN_S, doubling per re-trip up to
+    BREAKER_MAX_COOLDOWN_S). The first run after that is a half-open trial:
+    success closes the breaker, another block re-opens it for longer.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._state is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = {}
+        return self._state
+
+    def _get(self, source):
+        return self._load().setdefault(source, {"state": "closed", "failures": 0, "trips": 0, "open_until": 0.0})
+
+    def allow(self, source, now=None):
+        """True if the source may run now; an expired open breaker turns half-open for one trial."""
+        now = time.time() if now is None else now
+        with self._lock:
+            b = self._get(source)
+            if b["state"] != "open":
+                return True
+            if now < b["open_until"]:
+                return False
+            b["state"] = "half_open"
+        dbg("[BREAKER] half-open; trial run", {"source": source})
+        return True
+
+    def record(self, source, outcome, now=None):
+        """outcome: "ok" closes; "blocked" counts toward opening; anything else leaves the breaker as is."""
+        now = time.time() if now is None else now
+        with self._lock:
+            b = self._get(source)
+            prev = b["state"]
+            if outcome == "ok":
+                b.update(state="closed", failures=0, trips=0, open_until=0.0)
+            elif outcome == "blocked":
+                b["failures"] += 1
+                if prev == "half_open" or b["failures"] >= BREAKER_THRESHOLD:
+                    b["trips"] += 1
+                    cooldown = min(BREAKER_MAX_COOLDOWN_S, BREAKER_COOLDOWN_S * 2 ** (b["trips"] - 1))
+                    b.update(state="open", open_until=now + cooldown)
+            state = dict(b)
+        if state["state"] != prev:
+            dbg("[BREAKER] state change", {"source": source, "from": prev, "to": state["state"],
+                                           "open_until": _epoch_iso(state["open_until"]) if state["open_until"] else None})
+
+    def snapshot(self):
+        with self._lock:
+            return {src: dict(b, open_until=_epoch_iso(b["open_until"]) if b["open_until"] else None)
+                    for src, b in self._load().items()} or None
+
+    def save(self):
+        with self._lock:
+            if self._state is None:
+                return
+            data = json.dumps(self._state, indent=2)
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+def _epoch_iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds")
+
+BREAKERS = CircuitBreakers(BREAKER_PATH)
+
+# ----------------------- CONCURRENT SOURCE EXECUTOR --------------------------
+
+def _run_source(key, fn, cancel, started):
+    """
+    (rows, partial, aged): partial lists why the scan was incomplete (see
+    note_partial), aged the keys of listings dropped for age (note_aged_out).
+    """
+    _SOURCE_CTX.source, _SOURCE_CTX.cancel, _SOURCE_CTX.partial, _SOURCE_CTX.aged = key, cancel, [], []
+    started[key] = time.monotonic()
+    try:
+        dbg("[RUN] source begin", {"source": key})
+        with span("source", source=key):
+            rows = fn()
+        METRICS.incr("source_rows_total", len(rows), source=key)
+        dbg("[RUN] source done", {"source": key, "rows": len(rows), "partial": _SOURCE_CTX.partial or None,
+                                  "secs": round(time.monotonic() - started[key], 2)})
+        return rows, _SOURCE_CTX.partial, _SOURCE_CTX.aged
+    finally:
+        _SOURCE_CTX.source, _SOURCE_CTX.cancel, _SOURCE_CTX.partial, _SOURCE_CTX.aged = None, None, None, None
+
+def run_sources(selected):
+    """
+    Run the selected scrapers concurrently and return (rows, per_source, timings,
+    partial, aged); partial maps sources whose scan was incomplete (skipped pages,
+    max_results) to the reasons, and those sources close no postings; aged is
+    the set of job keys still listed but dropped for age.
+    HTTP sources share SOURCE_WORKERS threads (and SESSION's connection pool);
+    browser sources run on a dedicated worker. A source still running
+    SOURCE_TIMEOUT_S after it started is cancelled and reported as a timeout.
+    """
+    started, cancels, futures = {}, {}, {}
+    results, per_source, timings, partial, aged = {}, {}, {}, {}, set()
+    for key, src in SOURCE_REGISTRY.items():
+        if key not in selected:
+            continue
+        if not src.configured():
+            per_source[key] = "skipped: not configured"
+            dbg(f"[RUN] {key} skipped; not configured")
+            continue
+        if BREAKER_ENABLED and not BREAKERS.allow(key):
+            per_source[key] = "skipped: circuit open"
+            dbg(f"[RUN] {key} skipped; circuit open", BREAKERS.snapshot().get(key))
+            continue
+        cancels[key] = threading.Event()
+        pool = _executor("browser" if src.browser else "http")
+        futures[pool.submit(_run_source, key, functools.partial(collect_source, src), cancels[key], started)] = key
+
+    outcomes = {}
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        for f in list(pending):
+            key = futures[f]
+            t0 = started.get(key)
+            if t0 is not None and now - t0 >= SOURCE_TIMEOUT_S:
+                cancels[key].set()
+                pending.discard(f)
+                per_source[key] = "error: timeout"
+                outcomes[key] = "blocked"  # a board that hangs us past the deadline is as good as blocked
+                timings[key] = round(now - t0, 2)
+                dbg(f"[ERR] {key}", f"deadline of {SOURCE_TIMEOUT_S}s exceeded; cancelled")
+        if _SHUTDOWN.is_set():
+            for f in pending:
+                cancels[futures[f]].set()
+                per_source[futures[f]] = "error: shutdown"
+            pending.clear()
+        if not pending:
+            break
+        running = [started[futures[f]] + SOURCE_TIMEOUT_S - now for f in pending if futures[f] in started]
+        timeout = max(0.05, min(running)) if running else SOURCE_TIMEOUT_S
+        # wake at least once a second so a daemon shutdown is noticed mid-scrape
+        done, _ = wait(pending, timeout=min(timeout, 1.0), return_when=FIRST_COMPLETED)
+        for f in done:
+            pending.discard(f)
+            key = futures[f]
+            timings[key] = round(time.monotonic() - started.get(key, now), 2)
+            try:
+                rows, notes, aged_keys = f.result()
+                aged.update(aged_keys)
+                results[key] = rows
+                per_source[key] = len(rows)
+                if notes:
+                    partial[key] = sorted(set(notes))
+                outcomes[key] = "ok"
+            except Exception as e:
+                blocked = is_block(e)
+                per_source[key] = "blocked" if blocked else f"error: {type(e).__name__}"
+                outcomes[key] = "blocked" if blocked else "error"
+                dbg(f"[ERR] {key}", _redact_url(str(e)))
+
+    if BREAKER_ENABLED and outcomes and not _SHUTDOWN.is_set():
+        for key, outcome in outcomes.items():
+            BREAKERS.record(key, outcome)
+        try:
+            BREAKERS.save()
+        except OSError as e:
+            dbg("[BREAKER] save failed", str(e))
+
+    # Keep SOURCE_REGISTRY order so output is stable regardless of completion order
+    all_rows = []
+    for key in SOURCE_REGISTRY:
+        for r in results.get(key, []):
+            r["_source"] = key
+            all_rows.append(r)
+    return all_rows, per_source, timings, partial, aged
+
+def closing_sources(per_source, partial):
+    """Sources whose scan can close postings: only a complete, successful scan shows a posting is gone."""
+    return [k for k, v in per_source.items() if isinstance(v, int) and k not in partial]
+
+def dedupe_key(r):
+    return (r["Role"].lower(), r["Company/Agency"].lower(), r["Source (with link)"])
+
+@timed("dedupe")
+def dedupe(rows):
+    seen = set(); out = []
+    for r in rows:
+        key = dedupe_key(r)
+        if key in seen:
+            continue
+        seen.add(key); out.append(r)
+    return out
+
+def report_columns(df: pd.DataFrame):
+    """Drop internal bookkeeping columns (leading underscore) before rendering."""
+    return df.drop(columns=[c for c in df.columns if str(c).startswith("_")])
+
+# ----------------------- SEEN-JOBS STATE STORE -------------------------------
+
+# Fields outside the dedupe key, as a source reports them at scrape time, whose
+# change marks a posting "updated": the card's location and the listing's own
+# description (Adzuna). Enriched bodies land after reconcile and are not
+# fingerprinted. Posting Date is left out: seek/indeed stamp UTC_NOW on every
+# run, and card dates are relative.
+_FINGERPRINT_FIELDS = ("Engagement Type (Perm/Contract)", "_location", "_body")
+
+def _key_digest(parts):
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+def job_key(r):
+    return _key_digest(dedupe_key(r))
+
+def job_fingerprint(r):
+    return hashlib.sha1("\x1f".join(str(r.get(f) or "") for f in _FINGERPRINT_FIELDS).encode("utf-8")).hexdigest()
+
+class StateStore:
+    """
+    SQLite record of every posting seen, keyed on job_key(). reconcile() sorts
+    a run's rows into new / updated / unchanged, reuses the stored row for
+    unchanged postings, and closes postings that vanished from a source that
+    ran successfully. Postings that only left the time window (still listed
+    but too old, or gone with a board date older than the window) are
+    retired as Expired instead: they are not reported as closed.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        key TEXT PRIMARY KEY,
+        source TEXT,
+        fingerprint TEXT,
+        status TEXT,
+        first_seen TEXT,
+        last_seen TEXT,
+        closed_at TEXT,
+        row_json TEXT
+    );
+    CREATE INDEX IF NOT EXISTS jobs_source_status ON jobs (source, status);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(self.SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    @timed("state_reconcile")
+    def reconcile(self, rows, ok_sources, now, aged=(), since=None):
+        """
+        rows: deduped rows tagged with _source. ok_sources: sources that ran
+        without error (only these can have postings closed). aged: job keys
+        the sources still list but dropped for age; since: the window start
+        (default SINCE). Returns (rows, closed_rows, counts); each returned
+        row carries _state.
+        """
+        now_s = now.isoformat()
+        aged = set(aged)
+        counts = {"new": 0, "updated": 0, "unchanged": 0, "closed": 0, "expired": 0}
+        out, seen = [], set()
+        cur = self.db.cursor()
+        for r in rows:
+            key, fp = job_key(r), job_fingerprint(r)
+            seen.add(key)
+            prev = cur.execute("SELECT fingerprint, status, row_json FROM jobs WHERE key = ?", (key,)).fetchone()
+            if prev is None or prev[1] != "Active":
+                state = "new"
+            elif prev[0] != fp:
+                state = "updated"
+            else:
+                state = "unchanged"
+            counts[state] += 1
+            if state == "unchanged":
+                r = dict(json.loads(prev[2]), **{"Status (Active/Closed)": "Active", "_source": r.get("_source")})
+                cur.execute("UPDATE jobs SET last_seen = ? WHERE key = ?", (now_s, key))
+            else:
+                cur.execute(
+                    "INSERT INTO jobs (key, source, fingerprint, status, first_seen, last_seen, closed_at, row_json) "
+                    "VALUES (?, ?, ?, 'Active', ?, ?, NULL, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET source = excluded.source, fingerprint = excluded.fingerprint, "
+                    "status = 'Active', last_seen = excluded.last_seen, closed_at = NULL, row_json = excluded.row_json",
+                    (key, r.get("_source"), fp, now_s, now_s, self._row_json(r)))
+            out.append(dict(r, _state=state))
+
+        closed = []
+        if ok_sources:
+            marks = ",".join("?" * len(ok_sources))
+            for key, row_json in cur.execute(
+                    f"SELECT key, row_json FROM jobs WHERE status = 'Active' AND source IN ({marks})",
+                    tuple(ok_sources)).fetchall():
+                if key in seen:
+                    continue
+                r = json.loads(row_json)
+                if key in aged or out_of_window(r, since):
+                    counts["expired"] += 1
+                    cur.execute("UPDATE jobs SET status = 'Expired', closed_at = ? WHERE key = ?", (now_s, key))
+                    continue
+                r = dict(r, **{"Status (Active/Closed)": "Closed"})
+                closed.append(dict(r, _state="closed"))
+                cur.execute("UPDATE jobs SET status = 'Closed', closed_at = ?, row_json = ? WHERE key = ?",
+                            (now_s, self._row_json(r), key))
+        counts["closed"] = len(closed)
+        self.db.commit()
+        return out, closed, counts
+
+    def save_rows(self, rows):
+        """Persist rows changed after reconcile() (e.g. by enrichment)."""
+        self.db.executemany("UPDATE jobs SET row_json = ? WHERE key = ?",
+                            [(self._row_json(r), job_key(r)) for r in rows])
+        self.db.commit()
+
+    @staticmethod
+    def _row_json(r):
+        return json.dumps({k: v for k, v in r.items() if k != "_state"}, ensure_ascii=False, default=str)
+
+def open_state_store():
+    """Open the local state DB, first pulling the blob copy when STATE_BLOB_PATH is set."""
+    if STATE_BLOB_PATH:
+        try:
+            data = download_with_msi(STATE_BLOB_PATH)
+        except Exception as e:
+            data = None
+            dbg("[STATE] blob pull failed; using local copy", str(e))
+        if data:
+            d = os.path.dirname(STATE_DB_PATH)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            with open(STATE_DB_PATH, "wb") as f:
+                f.write(data)
+            dbg("[STATE] pulled from blob", {"path": STATE_BLOB_PATH, "bytes": len(data)})
+    return StateStore(STATE_DB_PATH)
+
+def close_state_store(store):
+    store.close()
+    if STATE_BLOB_PATH:
+        with open(STATE_DB_PATH, "rb") as f:
+            upload_with_msi(f.read(), STATE_BLOB_PATH, content_type="application/vnd.sqlite3")
+
+# ----------------------- DETAIL ENRICHMENT -----------------------------------
+
+class DetailCache:
+    """SQLite cache of parsed job pages keyed by URL; a posting is fetched once over its lifetime."""
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS details (
+        url TEXT PRIMARY KEY,
+        fetched_at TEXT,
+        body TEXT,
+        posted TEXT,
+        location TEXT,
+        company TEXT
+    );
+    """
+    FIELDS = ("body", "posted", "location", "company")
+
+    def __init__(self, path):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(self.SCHEMA)
+        if "company" not in {c[1] for c in self.db.execute("PRAGMA table_info(details)")}:
+            self.db.execute("ALTER TABLE details ADD COLUMN company TEXT")  # caches from before company was kept
+
+    def get(self, url):
+        hit = self.db.execute(f"SELECT {', '.join(self.FIELDS)} FROM details WHERE url = ?", (url,)).fetchone()
+        return dict(zip(self.FIELDS, hit)) if hit else None
+
+    def put(self, url, detail):
+        self.db.execute("INSERT OR REPLACE INTO details (url, fetched_at, body, posted, location, company) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (url, datetime.now(timezone.utc).isoformat(), *(detail.get(f) or "" for f in self.FIELDS)))
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+def _jsonld_job_posting(soup):
+    for tag in soup.select("script[type='application/ld+json']"):
+        try:
+            data = json.loads(tag.string or tag.get_text() or "")
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for it in items:
+            if isinstance(it, dict) and it.get("@type") in ("JobPosting", ["JobPosting"]):
+                return it
+    return None
+
+def _jsonld_company(posting):
+    org = posting.get("hiringOrganization") or {}
+    return normalize_text(org.get("name") if isinstance(org, dict) else org if isinstance(org, str) else "")
+
+def _jsonld_location(posting):
+    locs = posting.get("jobLocation") or []
+    for loc in locs if isinstance(locs, list) else [locs]:
+        addr = (loc or {}).get("address") or {}
+        if isinstance(addr, dict):
+            parts = [addr.get(k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [p.get("name", "") if isinstance(p, dict) else p for p in parts]
+            text = ", ".join(p for p in parts if p)
+            if text:
+                return text
+    return ""
+
+# Job-body containers on the boards we scrape, tried after JSON-LD
+_DETAIL_BODY_SELECTORS = ["[data-automation='jobAdDetails']", "#jobDescriptionText", "main", "article"]
+_DETAIL_LOCATION_SELECTORS = ["[data-automation='job-detail-location']", "[data-testid='inlineHeader-companyLocation']"]
+
+def parse_job_detail(html):
+    """Pull body text, posted date (ISO string or ''), location and hiring company out of a job page."""
+    soup = BeautifulSoup(html, _soup_features())
+    body, posted, location, company = "", "", "", ""
+    posting = _jsonld_job_posting(soup)
+    if posting:
+        body = normalize_text(BeautifulSoup(posting.get("description") or "", "html.parser").get_text(" "))
+        dt = parse_date_guess(posting.get("datePosted"))
+        posted = dt.isoformat() if dt else ""
+        location = _jsonld_location(posting)
+        company = _jsonld_company(posting)
+    if not body:
+        for sel in _DETAIL_BODY_SELECTORS:
+            el = soup.select_one(sel)
+            if el:
+                body = normalize_text(el.get_text(" "))
+                break
+    if not body:
+        meta = soup.select_one("meta[name='description']")
+        body = normalize_text(meta.get("content", "")) if meta else ""
+    if not location:
+        for sel in _DETAIL_LOCATION_SELECTORS:
+            el = soup.select_one(sel)
+            if el:
+                location = normalize_text(el.get_text(" "))
+                break
+    return {"body": body[:ENRICH_BODY_MAX_CHARS], "posted": posted, "location": location, "company": company}
+
+async def _afetch_many(urls, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(u):
+        try:
+            return u, await afetch(u, sem), None
+        except Exception as e:
+            return u, None, e
+
+    return await asyncio.gather(*(one(u) for u in urls))
+
+def fetch_many(urls, concurrency):
+    """Fetch urls with bounded concurrency; returns [(url, response_or_None, error_or_None)]."""
+    if not urls:
+        return []
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(_afetch_many(list(urls), concurrency))
+    finally:
+        loop.close()
+
+def _apply_detail(r, detail):
+    """Attach detail-page fields; score_frame() derives sector/engagement/score from them."""
+    body = detail.get("body") or ""
+    posted_dt = parse_date_guess(detail.get("posted")) or as_datetime(r["Posting Date"])
+    r["Posting Date"] = posted_dt
+    if body and "detail page" not in (r.get("_note") or ""):
+        r["_note"] = f"{r.get('_note') or ''}; scored on detail page".lstrip("; ")
+    r["_body"] = body
+    r["_location"] = detail.get("location") or ""
+    # Kept apart from Company/Agency, which is part of the state key; near-dup uses it
+    r["_company"] = detail.get("company") or ""
+    r["_enriched"] = True
+    # The board's own date, not the scrape time; out_of_window() checks it every run
+    r["_dated"] = bool(detail.get("posted")) and posted_dt is not None
+    return r
+
+def out_of_window(r, since=None):
+    """True for a row whose real (_dated) posting date is older than the window, however old the row is."""
+    if r.get("_stale"):
+        return True  # state rows written before _dated; flagged out of window then, older now
+    if not r.get("_dated"):
+        return False
+    posted_dt = as_datetime(r.get("Posting Date"))
+    return posted_dt is not None and posted_dt < (SINCE if since is None else since)
+
+@timed("enrich")
+def enrich_rows(rows, cache):
+    """
+    Fill body, real posting date and location from each posting's detail page. Only
+    rows not yet enriched are considered (new/updated first); at most
+    ENRICH_MAX_FETCHES pages are fetched per run, the rest wait for the next.
+    """
+    todo = [r for r in rows if not r.get("_enriched")]
+    todo.sort(key=lambda r: r.get("_state") == "unchanged")
+    stats = {"candidates": len(todo), "cache_hits": 0, "fetched": 0, "failed": 0, "deferred": 0}
+
+    to_fetch = []
+    for r in todo:
+        detail = cache.get(r["Source (with link)"])
+        if detail is not None:
+            stats["cache_hits"] += 1
+            _apply_detail(r, detail)
+        elif len(to_fetch) < ENRICH_MAX_FETCHES:
+            to_fetch.append(r)
+        else:
+            stats["deferred"] += 1
+
+    by_url = {}
+    for r in to_fetch:
+        by_url.setdefault(r["Source (with link)"], []).append(r)
+    for url, resp, err in fetch_many(list(by_url), ENRICH_WORKERS):
+        if err is not None:
+            stats["failed"] += 1
+            dbg("[ENRICH] detail fetch failed", {"url": _redact_url(url), "error": _redact_url(str(err))})
+            continue
+        detail = parse_job_detail(response_html(resp))
+        cache.put(url, detail)
+        stats["fetched"] += 1
+        for r in by_url[url]:
+            _apply_detail(r, detail)
+    dbg("[ENRICH] done", stats)
+    return stats, [r for r in todo if r.get("_enriched")]
+
+# ----------------------- NEAR-DUPLICATE DETECTION ----------------------------
+
+# Placeholder companies the HTTP scrapers use when the card has none
+PLACEHOLDER_COMPANIES = {"", "seek listing", "indeed listing", "adzuna listing"}
+_TITLE_NOISE = {"the", "a", "an", "and", "of", "for", "in", "at", "to", "-", "sydney", "nsw", "cbd",
+                "job", "jobs", "role", "new", "urgent", "au", "australia"}
+# 16 bands x 5 rows: the LSH S-curve crosses 1/2 near Jaccard 0.57, so pairs at the
+# 0.7 threshold collide in some band ~95% of the time (0.98 of true pairs on the
+# bench's 10k rows) while looser pairs mostly stay out of each other's buckets.
+_MINHASH_PERMS = 80
+_LSH_BANDS = 16
+_BODY_BANDS = 20                     # 20 bands x 4 rows on body words: copies near Jaccard 0.5+ meet
+
+_rng = random.Random(20240601)
+# Full 64-bit multipliers so (a*h + b) wraps mod 2**64; with 32-bit ones the map is
+# monotone in h and every "permutation" picks the same minimum token.
+_MH_A = np.array([_rng.randrange(1, 2 ** 64) | 1 for _ in range(_MINHASH_PERMS)], dtype=np.uint64)
+_MH_B = np.array([_rng.randrange(0, 2 ** 64) for _ in range(_MINHASH_PERMS)], dtype=np.uint64)
+
+def _title_tokens(title):
+    words = re.findall(r"[a-z0-9]+", (title or "").lower().replace("&", " and "))
+    return frozenset(w for w in words if w not in _TITLE_NOISE)
+
+def _company_key(company):
+    c = normalize_text(company).lower()
+    if c in PLACEHOLDER_COMPANIES:
+        return None
+    return re.sub(r"\b(pty|ltd|limited|group|australia|inc)\b|[^a-z0-9]+", "", c) or None
+
+def _row_company(r):
+    """The listed company, or the detail page's hiringOrganization when the listing had a placeholder."""
+    c = r["Company/Agency"]
+    return c if _company_key(c) else (r.get("_company") or c)
+
+# Location words every in-scope posting shares; what's left (a suburb) can back a match
+_LOCATION_NOISE = {"sydney", "nsw", "new", "south", "wales", "australia", "au", "cbd", "region", "greater", "all"}
+
+def _location_key(r):
+    words = set(re.findall(r"[a-z]+", (r.get("_location") or "").lower())) - _LOCATION_NOISE
+    return frozenset(words) or None
+
+def _body_words(r):
+    return frozenset(re.findall(r"[a-z0-9]{3,}", (r.get("_body") or "").lower()))
+
+def _minhash(shingles):
+    h = np.array([zlib.crc32(s.encode("utf-8")) for s in shingles], dtype=np.uint64)
+    # multiply-shift hashing; uint64 arithmetic wraps mod 2**64 on purpose
+    with np.errstate(over="ignore"):
+        v = (h[:, None] * _MH_A[None, :] + _MH_B[None, :]) >> np.uint64(32)
+    return v.min(axis=0)
+
+def _richness(r):
+    return ((2 if _company_key(_row_company(r)) else 0)
+            + (2 if r.get("_body") else 0) + min(len(r.get("_body") or ""), 5000) / 5000
+            + (1 if r.get("_enriched") else 0)
+            + (1 if r.get("_location") else 0))
+
+@timed("near_dedupe")
+def collapse_near_duplicates(rows, threshold=None):
+    """
+    Cluster cross-posted jobs (same role re-listed on another board or by an
+    agency) and keep the richest record of each cluster.
+
+    Titles are reduced to token sets; identical sets are grouped with a dict,
+    and similar sets are grouped through MinHash/LSH buckets (confirmed by
+    Jaccard >= threshold), so work grows with distinct titles, not row pairs.
+    Within a title group, rows with the same real company merge; a row with
+    only a placeholder company (the HTTP boards' cards) needs corroboration —
+    a similar body or the same suburb — since many employers share the target
+    titles. Two different URLs from the same board never merge. The survivor
+    lists the other copies in "Also Listed At" and borrows a real company
+    name if it had none.
+    """
+    threshold = NEARDUP_THRESHOLD if threshold is None else threshold
+    stats = {"rows_in": len(rows), "clusters_merged": 0, "rows_merged": 0, "pairs_checked": 0}
+    if len(rows) < 2:
+        return rows, stats
+
+    by_tokens = {}
+    for i, r in enumerate(rows):
+        by_tokens.setdefault(_title_tokens(r["Role"]), []).append(i)
+    sets = list(by_tokens)
+
+    # Each distinct title set joins the first earlier "leader" set it is similar to
+    # (candidates from shared LSH buckets), else leads a group of its own. Groups
+    # are titles close to one leader, so they can't chain across the title space.
+    leader_of, bucket_leaders = {}, {}
+    rows_per_band = _MINHASH_PERMS // _LSH_BANDS
+    for si, toks in enumerate(sets):
+        if not toks:
+            leader_of[si] = ("empty", si)
+            continue
+        sig = _minhash(toks)  # hashed as the same token sets Jaccard is confirmed on
+        keys = [(b, sig[b * rows_per_band:(b + 1) * rows_per_band].tobytes()) for b in range(_LSH_BANDS)]
+        seen, leader = set(), None
+        for k in keys:
+            for lj in bucket_leaders.get(k, ()):
+                if lj in seen:
+                    continue
+                seen.add(lj)
+                stats["pairs_checked"] += 1
+                if len(toks & sets[lj]) / len(toks | sets[lj]) >= threshold:
+                    leader = lj
+                    break
+            if leader is not None:
+                break
+        if leader is None:
+            leader = si
+            for k in keys:
+                bucket_leaders.setdefault(k, []).append(si)
+        leader_of[si] = leader
+
+    title_groups = {}
+    for si, toks in enumerate(sets):
+        title_groups.setdefault(leader_of[si], []).extend(by_tokens[toks])
+
+    body_threshold = NEARDUP_BODY_THRESHOLD
+    companies, locations, bodies, body_sigs = {}, {}, {}, {}
+    rows_per_body_band = _MINHASH_PERMS // _BODY_BANDS
+
+    def linked(i, j):
+        ci, cj = companies[i], companies[j]
+        if ci and cj:
+            return ci == cj
+        if locations[i] and locations[i] == locations[j]:
+            return True
+        bi, bj = bodies[i], bodies[j]
+        return bool(bi and bj) and len(bi & bj) / len(bi | bj) >= body_threshold
+
+    def meeting_keys(i):
+        """Keys under which row i can meet the rows linked() may accept."""
+        keys = [("company", companies[i])] if companies[i] else []
+        if locations[i]:
+            keys.append(("location", locations[i]))
+        if bodies[i]:
+            sig = body_sigs.get(bodies[i])
+            if sig is None:
+                sig = body_sigs[bodies[i]] = _minhash(bodies[i])
+            keys += [("body", b, sig[b * rows_per_body_band:(b + 1) * rows_per_body_band].tobytes())
+                     for b in range(_BODY_BANDS)]
+        return keys
+
+    def split_group(idx):
+        # Two postings on one board are never copies of each other, so clusters are
+        # indexed per (meeting key, board they have no row from yet) and a row only
+        # looks at clusters it could join; entries go stale when that board joins
+        # and are dropped as they are met.
+        group, boards, where = [], [], {}
+        all_boards = {rows[i].get("_source") for i in idx} | {None}
+        for i in sorted(idx):
+            companies[i] = _company_key(_row_company(rows[i]))
+            locations[i] = _location_key(rows[i])
+            bodies[i] = _body_words(rows[i])
+            board = rows[i].get("_source")
+            keys = meeting_keys(i) if companies[i] or locations[i] or bodies[i] else []
+            home = None
+            for k in keys:
+                open_clusters = where.get((k, board), {})
+                for h in list(open_clusters):
+                    if board is not None and board in boards[h]:
+                        del open_clusters[h]
+                    elif any(linked(i, j) for j in group[h]):
+                        home = h
+                        break
+                if home is not None:
+                    break
+            if home is None:
+                home = len(group)
+                group.append([])
+                boards.append(set())
+            group[home].append(i)
+            boards[home].add(board)
+            for k in keys:
+                for b in all_boards - boards[home] | {None}:
+                    where.setdefault((k, b), {})[home] = None
+        return group
+
+    clusters = []
+    for idx in title_groups.values():
+        clusters.extend(split_group(idx) if len(idx) > 1 else [idx])
+
+    out = []
+    for idx in sorted(clusters, key=lambda c: c[0]):
+        if len(idx) == 1:
+            out.append(rows[idx[0]])
+            continue
+        keep = max(idx, key=lambda i: (_richness(rows[i]), -i))
+        r = rows[keep]
+        others = [rows[i] for i in idx if i != keep]
+        if not _company_key(r["Company/Agency"]):
+            real = next((_row_company(o) for o in [r] + others if _company_key(_row_company(o))), None)
+            if real:
+                r["Company/Agency"] = real
+        r["Also Listed At"] = "; ".join(f"{o.get('_source') or 'unknown'}: {o['Source (with link)']}" for o in others)
+        out.append(r)
+        stats["clusters_merged"] += 1
+        stats["rows_merged"] += len(others)
+    return out, stats
+
+# ----------------------- PARQUET ARCHIVE -------------------------------------
+
+# Report column -> archive column (snake_case, typed)
+_ARCHIVE_COLUMNS = {
+    "Role": "role",
+    "Company/Agency": "company",
+    "Source (with link)": "url",
+    "Posting Date": "posted",
+    "Engagement Type (Perm/Contract)": "engagement",
+    "Status (Active/Closed)": "status",
+    "Sector": "sector",
+    "Alignment Score (1–10)": "score",
+    "Also Listed At": "also_listed",
+    "_source": "source",
+    "_state": "state",
+}
+
+def _archive_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("key", pa.string()),
+        ("role", pa.string()),
+        ("company", pa.string()),
+        ("url", pa.string()),
+        ("posted", pa.timestamp("us", tz="UTC")),
+        ("engagement", pa.string()),
+        ("status", pa.string()),
+        ("sector", pa.string()),
+        ("score", pa.int16()),
+        ("also_listed", pa.string()),
+        ("source", pa.string()),
+        ("state", pa.string()),
+        ("run_ts", pa.timestamp("us", tz="UTC")),
+    ])
+
+@timed("archive")
+def archive_rows(df, run_ts):
+    """
+    Append this run's scored rows (typed frame from score_frame) to the
+    ARCHIVE_DIR dataset as one file under run_date=YYYY-MM-DD/, and mirror the
+    file to ARCHIVE_PREFIX in the artifact store. Returns the archive stats.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ModuleNotFoundError as e:
+        dbg("[ARCHIVE] pyarrow not installed; skipping", str(e))
+        return None
+    if df.empty:
+        return {"rows": 0}
+
+    out = pd.DataFrame({dst: df[src] if src in df.columns else None for src, dst in _ARCHIVE_COLUMNS.items()},
+                       index=df.index)
+    out.insert(0, "key", [_key_digest(k) for k in
+                          zip(df["Role"].str.lower(), df["Company/Agency"].str.lower(), df["Source (with link)"])])
+    out["score"] = out["score"].astype("Int16")
+    out["run_ts"] = pd.Timestamp(run_ts)
+    table = pa.Table.from_pandas(out, schema=_archive_schema(), preserve_index=False)
+
+    run_date = run_ts.strftime("%Y-%m-%d")
+    name = f"part-{run_ts.strftime('%H%M%S')}-{hashlib.sha1(os.urandom(8)).hexdigest()[:8]}.parquet"
+    rel = f"run_date={run_date}/{name}"
+    local = os.path.join(ARCHIVE_DIR, f"run_date={run_date}", name)
+    os.makedirs(os.path.dirname(local), exist_ok=True)
+    pq.write_table(table, local, compression="zstd")
+    with open(local, "rb") as f:
+        upload_with_msi(f.read(), f"{ARCHIVE_PREFIX}/{rel}", content_type="application/vnd.apache.parquet")
+    stats = {"rows": table.num_rows, "file": local, "bytes": os.path.getsize(local)}
+    dbg("[ARCHIVE] appended", stats)
+    return stats
+
+def query_archive(columns=None, start=None, end=None, sources=None, min_score=None, posted_since=None,
+                  root=None, filesystem=None):
+    """
+    Read the archive as a DataFrame, touching only what is asked for:
+    `columns` are projected, start/end (dates or "YYYY-MM-DD", inclusive)
+    prune run_date partitions, and sources / min_score / posted_since are
+    pushed down as row filters (row groups are skipped by their statistics).
+    root/filesystem default to ARCHIVE_DIR on local disk; pass a pyarrow
+    filesystem to read a mounted or remote copy of ARCHIVE_PREFIX instead.
+    Example: query_archive(["role", "company", "posted"], start="2024-06-01", min_score=7)
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    def day(d):
+        return d if isinstance(d, str) else d.strftime("%Y-%m-%d")
+
+    filters = []
+    if start is not None:
+        filters.append(ds.field("run_date") >= day(start))
+    if end is not None:
+        filters.append(ds.field("run_date") <= day(end))
+    if sources:
+        filters.append(ds.field("source").isin(list(sources)))
+    if min_score is not None:
+        filters.append(ds.field("score") >= min_score)
+    if posted_since is not None:
+        ts = pd.Timestamp(posted_since)
+        filters.append(ds.field("posted") >= (ts.tz_localize("UTC") if ts.tzinfo is None else ts))
+    expr = None
+    for f in filters:
+        expr = f if expr is None else expr & f
+
+    dataset = ds.dataset(root or ARCHIVE_DIR, format="parquet", filesystem=filesystem,
+                         partitioning=ds.partitioning(pa.schema([("run_date", pa.string())]), flavor="hive"))
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+def to_html_table(df: pd.DataFrame, report_title: str):
+    header = f"<h2>{report_title}</h2>"
+    return header + df.to_html(index=False, escape=False)
+
+# ----------------------- STREAMING REPORT WRITERS ----------------------------
+
+def _spool():
+    """Temp file that stays in memory up to REPORT_SPOOL_MB, then spills to disk."""
+    return tempfile.SpooledTemporaryFile(max_size=int(REPORT_SPOOL_MB * 1024 * 1024), mode="w+b")
+
+def iter_report_chunks(df):
+    """Display-formatted slices of the ranked frame, REPORT_CHUNK_ROWS at a time."""
+    for start in range(0, len(df), REPORT_CHUNK_ROWS):
+        yield format_report(df.iloc[start:start + REPORT_CHUNK_ROWS])
+
+def write_csv_stream(df, out):
+    """CSV of the ranked frame into a binary file, one chunk at a time. Returns bytes written."""
+    n = 0
+    for i, chunk in enumerate(iter_report_chunks(df)):
+        n += out.write(chunk.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+    out.seek(0)
+    return n
+
+def write_html_stream(df, out, report_title):
+    """
+    Same table to_html_table() renders, written chunk by chunk: the header is
+    emitted once and each chunk contributes only its <tbody> rows.
+    """
+    n = 0
+    for i, chunk in enumerate(iter_report_chunks(df)):
+        html = chunk.to_html(index=False, escape=False)
+        body_at = html.index("<tbody>\n") + len("<tbody>\n")
+        end_at = html.rindex("  </tbody>")
+        if i == 0:
+            n += out.write((f"<h2>{report_title}</h2>" + html[:body_at]).encode("utf-8"))
+        n += out.write(html[body_at:end_at].encode("utf-8"))
+    n += out.write(b"  </tbody>\n</table>")
+    out.seek(0)
+    return n
+
+# ----------------------- ARTIFACT STORAGE ------------------------------------
+
+class BlobStore:
+    """
+    Blob container backend. The credential, service client and "container
+    exists" check are created once and shared by every upload in the process
+    (the Azure SDK clients are thread-safe). STORAGE_CONNECTION_STRING, when
+    set, is used instead of MSI — e.g. for a local Azurite emulator.
+    """
+    kind = "azure"
+
+    def __init__(self, container):
+        self.container_name = container
+        self._container = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        with self._lock:
+            if self._container is None:
+                # Anything over 4 MiB is sent as staged blocks read from the stream
+                chunking = {"max_single_put_size": 4 * 1024 * 1024, "max_block_size": 4 * 1024 * 1024}
+                if STORAGE_CONNECTION_STRING:
+                    bsc = BlobServiceClient.from_connection_string(STORAGE_CONNECTION_STRING, **chunking)
+                else:
+                    account_url = f"https://{STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
+                    bsc = BlobServiceClient(account_url=account_url, credential=DefaultAzureCredential(), **chunking)
+                container = bsc.get_container_client(self.container_name)
+                try:
+                    container.create_container()
+                except ResourceExistsError:
+                    pass
+                except Exception as e:
+                    # e.g. MSI may write blobs but not create containers
+                    dbg("[STORE] create_container failed; assuming it exists", str(e))
+                self._container = container
+            return self._container
+
+    def put(self, path, data, content_type, content_encoding=None):
+        """data: bytes or a binary file object positioned at its start."""
+        self._client().get_blob_client(path).upload_blob(
+            data,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type, content_encoding=content_encoding),
+        )
+        return path
+
+    def get(self, path):
+        try:
+            return self._client().get_blob_client(path).download_blob().readall()
+        except ResourceNotFoundError:
+            return None
+
+class LocalStore:
+    """Filesystem backend rooted at LOCAL_OUTPUT_DIR; gzip-encoded artifacts get a .gz suffix."""
+    kind = "local"
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, path):
+        return os.path.join(self.root, *path.split("/"))
+
+    def put(self, path, data, content_type, content_encoding=None):
+        if content_encoding == "gzip":
+            path += ".gz"
+        full = self._path(path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full + ".tmp", "wb") as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f, 1024 * 1024)
+        os.replace(full + ".tmp", full)
+        return path
+
+    def get(self, path):
+        try:
+            with open(self._path(path), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+UPLOAD_LOG = []  # one entry per artifact written this run, for debug.json
+
+def get_store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            backend = STORAGE_BACKEND or ("azure" if (STORAGE_ACCOUNT_NAME or STORAGE_CONNECTION_STRING) else "local")
+            _STORE = BlobStore(STORAGE_CONTAINER) if backend == "azure" else LocalStore(LOCAL_OUTPUT_DIR)
+            dbg("[STORE] backend", {"kind": _STORE.kind,
+                                    "target": STORAGE_CONTAINER if backend == "azure" else LOCAL_OUTPUT_DIR})
+        return _STORE
+
+def _should_gzip(content_type):
+    return content_type.split(";")[0].strip() in STORAGE_GZIP_TYPES
+
+def _size_of(data):
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    pos = data.tell()
+    n = data.seek(0, os.SEEK_END)
+    data.seek(pos)
+    return n
+
+def _gzip_stream(data):
+    out = _spool()
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as z:
+        shutil.copyfileobj(data, z, 1024 * 1024)
+    out.seek(0)
+    return out
+
+def put_artifact(data, path: str, content_type: str):
+    """
+    Write one artifact — bytes, or a binary file object at its start, which is
+    streamed rather than read into memory. STORAGE_GZIP_TYPES are compressed
+    and stored with Content-Encoding: gzip. Returns its timing/size entry.
+    """
+    t0 = time.monotonic()
+    size = _size_of(data)
+    encoding = "gzip" if _should_gzip(content_type) and size else None
+    with span("upload", artifact=path.rsplit("/", 1)[-1].split("-")[0]):
+        if encoding:
+            payload = gzip.compress(data, compresslevel=6) if isinstance(data, (bytes, bytearray)) else _gzip_stream(data)
+        else:
+            payload = data
+        stored = get_store().put(path, payload, content_type, content_encoding=encoding)
+    METRICS.incr("upload_bytes_total", _size_of(payload), backend=get_store().kind)
+    entry = {"path": stored, "bytes": size, "stored_bytes": _size_of(payload),
+             "encoding": encoding, "ms": round((time.monotonic() - t0) * 1000, 1)}
+    UPLOAD_LOG.append(entry)
+    dbg("[STORE] uploaded", entry)
+    return entry
+
+def put_artifacts(artifacts):
+    """Upload [(bytes_or_file, path, content_type)] in parallel; raises the first failure after all finish."""
+    pool = _executor("uploads")
+    futures = [pool.submit(put_artifact, data, path, ctype) for data, path, ctype in artifacts]
+    wait(futures)
+    return [f.result() for f in futures]
+
+def upload_with_msi(local_bytes: bytes, path: str, content_type: str = "text/csv"):
+    return put_artifact(local_bytes, path, content_type)
+
+def download_with_msi(path: str):
+    """Return the stored artifact's bytes, or None if it does not exist yet."""
+    data = get_store().get(path)
+    if data is not None:
+        dbg("[STORE] downloaded", {"path": path, "bytes": len(data)})
+    return data
+
+def send_email_report(df, csv_file, title, report_path):
+    """
+    Optional: direct email via SendGrid (Logic App recommended instead).
+    The body is a bounded top-N table; the CSV rides along only while it is small.
+    """
+    if not (EMAIL_TO and EMAIL_PROVIDER.lower()=="sendgrid" and SENDGRID_API_KEY and not df.empty):
+        return
+    with span("email"):
+        try:
+            from sendgrid import SendGridAPIClient
+            from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
+            top = format_report(df.head(EMAIL_TOP_N))
+            html_content = to_html_table(top, title)
+            if len(df) > len(top):
+                html_content += f"<p>Top {len(top)} of {len(df)} roles. Full report: {report_path}</p>"
+            message = Mail(
+                from_email="no-reply@yourdomain.com",
+                to_emails=EMAIL_TO,
+                subject=title,
+                html_content=html_content
+            )
+            csv_size = _size_of(csv_file)
+            if csv_size <= EMAIL_ATTACH_MAX_BYTES:
+                csv_file.seek(0)
+                attachment = Attachment()
+                attachment.file_content = FileContent(base64.b64encode(csv_file.read()).decode())
+                attachment.file_type = FileType("text/csv")
+                attachment.file_name = FileName("report.csv")
+                attachment.disposition = Disposition("attachment")
+                message.attachment = attachment
+            else:
+                dbg("[EMAIL] csv too large to attach", {"bytes": csv_size, "max": EMAIL_ATTACH_MAX_BYTES})
+            SendGridAPIClient(SENDGRID_API_KEY).send(message)
+            dbg("[EMAIL] sendgrid ok")
+        except Exception as e:
+            dbg("[EMAIL] sendgrid error", str(e))
+
+def _start_clock():
+    """Stamp this run's UTC_NOW / SINCE; the daemon calls it at the start of every cycle."""
+    global UTC_NOW, SINCE
+    UTC_NOW = datetime.now(timezone.utc)
+    SINCE = UTC_NOW - timedelta(days=TIME_WINDOW_DAYS)
+
+def _select_sources():
+    # sanity: unknown sources notice
+    KNOWN = set(SOURCE_REGISTRY.keys())
+    unknown = [s for s in SOURCES if s not in KNOWN]
+    if unknown:
+        dbg("[CFG] unknown sources requested", {"unknown": unknown})
+
+    # If SOURCES is empty, run every configured source; else restrict to provided set
+    selected = set(SOURCES) if SOURCES else {k for k, src in SOURCE_REGISTRY.items() if src.configured()}
+    dbg("[RUN] selected sources", list(selected))
+    return selected
+
+def run_report(selected, reuse=None, email=True, keep_browser=False):
+    """
+    One scan: scrape `selected`, reconcile/enrich/score, write and upload the
+    report. reuse maps source -> (rows, monotonic scrape time) from earlier
+    cycles; those rows stand in for sources not scraped (or failed) this time.
+    Returns {source: rows} as scraped this run, for the caller to reuse.
+    """
+    _start_clock()
+    UPLOAD_LOG.clear()
+    METRICS.reset()
+    SEEK_DIRECT_STATS.clear()
+    if HTTP_CACHE is not None:
+        HTTP_CACHE.reset_counters()
+    HOST_LIMITER.new_run()
+    t_main = time.monotonic()
+
+    # Build filenames/folder up-front so helpers can reuse
+    folder = f"{REPORT_PREFIX}/{UTC_NOW.strftime('%Y-%m-%d')}"
+    csv_name = f"{folder}/report.csv"
+    html_name = f"{folder}/report.html"
+    debug_name = f"{folder}/debug.json"
+    title = f"Sydney Data Leadership Intelligence Report — {datetime.now().strftime('%d %B %Y')} (08:30 Sydney)"
+
+    t_run = time.monotonic()
+    all_rows, per_source, source_secs, partial, aged = run_sources(selected)
+    if not keep_browser:
+        close_browser_pool()
+    if _SHUTDOWN.is_set():
+        dbg("[RUN] shutdown during scrape; skipping report", per_source)
+        return {}
+    fresh = {}
+    for r in all_rows:
+        if isinstance(per_source.get(r["_source"]), int):
+            fresh.setdefault(r["_source"], []).append(dict(r))
+    reused = {}
+    for key, (rows, at) in (reuse or {}).items():
+        if isinstance(per_source.get(key), int):
+            continue
+        all_rows.extend(dict(r) for r in rows)
+        reused[key] = {"rows": len(rows), "age_s": round(time.monotonic() - at, 1)}
+        per_source.setdefault(key, "reused")
+    dbg("[RUN] totals pre-dedupe", {"rows": len(all_rows), "per_source": per_source, "partial": partial or None,
+                                    "reused": reused or None,
+                                    "wall_secs": round(time.monotonic() - t_run, 2)})
+
+    all_rows = dedupe(all_rows)
+    dbg("[RUN] totals post-dedupe", {"rows": len(all_rows)})
+
+    # Incremental state: reuse unchanged postings, close the ones that vanished
+    state_counts, enrich_stats, closed_rows = None, None, []
+    store = open_state_store() if STATE_ENABLED else None
+    try:
+        if store is not None:
+            ok_sources = closing_sources(per_source, partial)
+            all_rows, closed_rows, state_counts = store.reconcile(all_rows, ok_sources, UTC_NOW, aged, SINCE)
+            dbg("[STATE] reconciled", state_counts)
+
+        # Detail enrichment for postings not yet enriched (new/updated first)
+        if ENRICH_ENABLED:
+            details = DetailCache(DETAIL_CACHE_PATH)
+            try:
+                enrich_stats, enriched = enrich_rows(all_rows, details)
+            finally:
+                details.close()
+            if store is not None:
+                store.save_rows(enriched)
+    finally:
+        if store is not None:
+            close_state_store(store)
+
+    # Against this run's window: rows reused from state were dated on an earlier run
+    all_rows = [r for r in all_rows if not out_of_window(r)]
+    neardup_stats = None
+    if NEARDUP_ENABLED:
+        all_rows, neardup_stats = collapse_near_duplicates(all_rows)
+        dbg("[RUN] near-duplicates collapsed", neardup_stats)
+    if STATE_REPORT_MODE == "changes":
+        all_rows = [r for r in all_rows if r.get("_state") != "unchanged"]
+    all_rows.extend(closed_rows)
+
+    # Score and rank the whole batch at once; format only for the report
+    df = rank_frame(score_frame(listings_frame(all_rows)))
+    archive_stats = None
+    if ARCHIVE_ENABLED:
+        try:
+            archive_stats = archive_rows(df, UTC_NOW)
+        except Exception as e:
+            dbg("[ARCHIVE] append failed", str(e))
+    del all_rows  # the ranked frame is the one copy from here on
+
+    # Reports are rendered chunk by chunk into spooled files and streamed to storage
+    csv_file, html_file = _spool(), _spool()
+    with span("report_render"):
+        if df.empty:
+            html_file.write("<p>No matching roles today.</p>".encode("utf-8")); html_file.seek(0)
+        else:
+            write_csv_stream(df, csv_file)
+            write_html_stream(df, html_file, title)
+
+    # Debug artifact (always written)
+    summary = {
+        "since_utc": SINCE.isoformat(),
+        "now_utc": UTC_NOW.isoformat(),
+        "selected_sources": list(selected),
+        "per_source": per_source,
+        "partial_sources": partial or None,
+        "source_capabilities": {k: SOURCE_REGISTRY[k].capabilities() for k in selected if k in SOURCE_REGISTRY},
+        "reused_sources": reused or None,
+        "source_secs": source_secs,
+        "http_cache": HTTP_CACHE.stats() if HTTP_CACHE is not None else None,
+        "throttled_hosts": HOST_LIMITER.stats(),
+        "breakers": BREAKERS.snapshot() if BREAKER_ENABLED else None,
+        "seek_direct": SEEK_DIRECT_STATS or None,
+        "state": state_counts,
+        "enrich": enrich_stats,
+        "near_duplicates": neardup_stats,
+        "archive": archive_stats,
+        "total_rows": 0 if df.empty else int(df.shape[0])
+    }
+    # Reports go up in parallel; debug.json last so it can carry upload/email timings
+    put_artifacts([
+        (csv_file,  csv_name,  "text/csv"),
+        (html_file, html_name, "text/html"),
+    ])
+    html_file.close()
+    if email:
+        send_email_report(df, csv_file, title, html_name)
+    csv_file.close()
+
+    summary["uploads"] = list(UPLOAD_LOG)
+    summary["run_secs"] = round(time.monotonic() - t_main, 2)
+    summary["timings"] = METRICS.snapshot()
+    debug_bytes = json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8")
+    upload_with_msi(debug_bytes, debug_name, content_type="application/json")
+    if METRICS_PROM_PATH:
+        METRICS.write_prometheus(METRICS_PROM_PATH)
+    return fresh
+
+# ----------------------- DAEMON MODE -----------------------------------------
+
+_SHUTDOWN = threading.Event()  # set by SIGTERM/SIGINT in daemon mode
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_duration_s(text):
+    """'90', '45s', '30m', '1h', '1.5h', '1d' -> seconds."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", (text or "").lower())
+    if not m:
+        raise ValueError(f"bad duration: {text!r}")
+    return float(m.group(1)) * _DURATION_UNITS[m.group(2)]
+
+def parse_source_schedule(spec, sources):
+    """
+    SOURCE_SCHEDULE ("indeed=1h/5m,seek_direct=6h") -> {source: (interval_s, jitter_s)}
+    for every selected source. Unlisted sources get DAEMON_DEFAULT_INTERVAL;
+    a missing jitter defaults to DAEMON_JITTER_FRAC of the interval.
+    """
+    given = {}
+    for part in (p.strip() for p in (spec or "").split(",")):
+        if not part:
+            continue
+        key, _, cadence = part.partition("=")
+        interval, _, jitter = cadence.partition("/")
+        given[key.strip().lower()] = (parse_duration_s(interval), parse_duration_s(jitter) if jitter else None)
+    unknown = sorted(set(given) - set(sources))
+    if unknown:
+        dbg("[DAEMON] schedule names sources that are not selected", {"ignored": unknown})
+    default = parse_duration_s(DAEMON_DEFAULT_INTERVAL)
+    out = {}
+    for src in sources:
+        interval, jitter = given.get(src, (default, None))
+        out[src] = (interval, interval * DAEMON_JITTER_FRAC if jitter is None else jitter)
+    return out
+
+class SourceScheduler:
+    """
+    Monotonic next-due time per source. Every source is due on the first
+    cycle; after a run it is due again in interval +/- a uniform jitter, so
+    sources drift apart instead of hitting the boards in lockstep.
+    """
+    def __init__(self, schedule, now, rng=None):
+        self.schedule = schedule
+        self.rng = rng or random.Random()
+        self.next_due = {src: now for src in schedule}
+
+    def due(self, now):
+        return {src for src, t in self.next_due.items() if t <= now}
+
+    def ran(self, src, started):
+        interval, jitter = self.schedule[src]
+        self.next_due[src] = started + max(1.0, interval + self.rng.uniform(-jitter, jitter))
+
+    def wait_s(self, now):
+        return max(0.0, min(self.next_due.values()) - now) if self.next_due else 60.0
+
+@contextmanager
+def run_lock(path=None):
+    """
+    Non-blocking exclusive flock on RUN_LOCK_PATH, held for one run or cycle.
+    Yields False when another process (a second daemon, a one-shot container)
+    holds it. Platforms without fcntl always get the lock.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield True
+        return
+    path = path or RUN_LOCK_PATH
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(path, "a+") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            locked = True
+        except OSError:
+            locked = False
+        try:
+            if locked:
+                f.seek(0); f.truncate(); f.write(f"{os.getpid()}\n"); f.flush()
+            yield locked
+        finally:
+            if locked:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def _install_shutdown_handlers():
+    def stop(signum, frame):
+        if _SHUTDOWN.is_set():
+            raise KeyboardInterrupt  # second signal: stop now
+        dbg("[DAEMON] shutdown requested; finishing current cycle", {"signal": signal.Signals(signum).name})
+        _SHUTDOWN.set()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, stop)
+
+def daemon():
+    """
+    Long-running mode: sources run on their own SOURCE_SCHEDULE cadence in one
+    process, so SESSION, the browser pool, caches and storage credentials stay
+    warm. Each cycle scrapes only the due sources and reports them together
+    with the latest rows of the rest. Cycles never overlap (run_lock), and
+    SIGTERM lets the current cycle finish before exiting.
+    """
+    selected = _select_sources()
+    schedule = parse_source_schedule(SOURCE_SCHEDULE, selected)
+    sched = SourceScheduler(schedule, time.monotonic())
+    _install_shutdown_handlers()
+    dbg("[DAEMON] start", {src: {"interval_s": i, "jitter_s": round(j, 1)} for src, (i, j) in schedule.items()})
+
+    last_rows, cycle, emailed_day = {}, 0, None
+    try:
+        while not _SHUTDOWN.is_set():
+            now = time.monotonic()
+            due = sched.due(now)
+            if due:
+                with run_lock() as locked:
+                    if not locked:
+                        dbg("[DAEMON] another run holds the lock; retrying in 60s", {"lock": RUN_LOCK_PATH})
+                        _SHUTDOWN.wait(60)
+                        continue
+                    cycle += 1
+                    for src in due:
+                        sched.ran(src, now)
+                    day = datetime.now(timezone.utc).date()
+                    email = DAEMON_EMAIL == "every" or (DAEMON_EMAIL == "daily" and day != emailed_day)
+                    dbg("[DAEMON] cycle begin", {"cycle": cycle, "due": sorted(due), "email": email})
+                    try:
+                        fresh = run_report(due, reuse=last_rows, email=email, keep_browser=True)
+                        last_rows.update({src: (rows, now) for src, rows in fresh.items()})
+                        if email and not _SHUTDOWN.is_set():
+                            emailed_day = day
+                    except Exception as e:
+                        dbg("[DAEMON] cycle failed", {"cycle": cycle, "error": repr(e)})
+                    dbg("[DAEMON] cycle end", {"cycle": cycle, "secs": round(time.monotonic() - now, 1),
+                                               "next_in_s": round(sched.wait_s(time.monotonic()), 1)})
+            _SHUTDOWN.wait(sched.wait_s(time.monotonic()))
+    finally:
+        close_browser_pool()
+        dbg("[DAEMON] stopped", {"cycles": cycle})
+
+def main():
+    """One-shot run: every selected source, one report, then exit."""
+    with run_lock() as locked:
+        if not locked:
+            dbg("[RUN] another run holds the lock; exiting", {"lock": RUN_LOCK_PATH})
+            return
+        run_report(_select_sources())
+
+if __name__ == "__main__":
+    daemon() if RUN_MODE == "daemon" else main()
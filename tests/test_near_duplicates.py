@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for k, v in {"HTTP_CACHE": "0", "STATE": "0", "ENRICH": "0", "ARCHIVE": "0", "BREAKER": "0",
+             "STORAGE_BACKEND": "local"}.items():
+    os.environ.setdefault(k, v)
+
+import main  # noqa: E402
+
+
+def listing(source, url, title="Head of Data", company=None, body="", location=""):
+    placeholder = {"seek": "Seek Listing", "indeed": "Indeed Listing"}.get(source, "")
+    r = main.row(title, company or placeholder, url, main.UTC_NOW, "Permanent", "Active",
+                 "edge-case/other", "Sydney search", None)
+    r.update({"_source": source, "_body": body, "_location": location})
+    return r
+
+
+def test_placeholder_rows_with_nothing_in_common_stay_apart():
+    rows = [listing("seek", "https://www.seek.com.au/job/1"),
+            listing("seek", "https://www.seek.com.au/job/2"),
+            listing("indeed", "https://au.indeed.com/viewjob?jk=1")]
+    out, stats = main.collapse_near_duplicates(rows)
+    assert len(out) == 3
+    assert stats["rows_merged"] == 0
+
+
+def test_same_board_different_urls_never_merge():
+    body = "Lead the azure data platform team for a retail bank in Sydney"
+    rows = [listing("seek", "https://www.seek.com.au/job/1", company="Westpac", body=body),
+            listing("seek", "https://www.seek.com.au/job/2", company="Westpac", body=body)]
+    out, _ = main.collapse_near_duplicates(rows)
+    assert len(out) == 2
+
+
+def test_cross_post_backed_by_body_merges():
+    body = "Lead the azure data platform team for a retail bank, hybrid from the Sydney CBD office"
+    rows = [listing("seek", "https://www.seek.com.au/job/1", body=body),
+            listing("indeed", "https://au.indeed.com/viewjob?jk=1", body=body + " Apply now."),
+            listing("seek", "https://www.seek.com.au/job/2", body="Healthcare analytics function, permanent")]
+    out, stats = main.collapse_near_duplicates(rows)
+    assert len(out) == 2
+    assert stats["rows_merged"] == 1
+
+
+def test_detail_company_backs_placeholder_rows():
+    a = listing("seek", "https://www.seek.com.au/job/1")
+    b = listing("indeed", "https://au.indeed.com/viewjob?jk=1", title="Head of Data - Sydney")
+    a["_company"] = b["_company"] = "Canva"
+    out, _ = main.collapse_near_duplicates([a, b])
+    assert len(out) == 1
+    assert out[0]["Company/Agency"] == "Canva"
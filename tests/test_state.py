@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for k, v in {"HTTP_CACHE": "0", "STATE": "0", "ENRICH": "0", "ARCHIVE": "0", "BREAKER": "0",
+             "STORAGE_BACKEND": "local"}.items():
+    os.environ.setdefault(k, v)
+
+import main  # noqa: E402
+
+
+def listing(url, title="Head of Data", source="seek", posted=None):
+    r = main.row(title, "Westpac", url, posted or main.UTC_NOW, "Permanent", "Active",
+                 "edge-case/other", "Sydney search", None)
+    r["_source"] = source
+    return r
+
+
+class FakeSource(main.Source):
+    key = "fake"
+    base_url = "https://jobs.example"
+
+    def __init__(self, raws, max_results=None):
+        self.raws, self.max_results = raws, max_results
+
+    def listings(self):
+        yield from self.raws
+
+
+def scan(src):
+    return main._run_source(src.key, lambda: main.collect_source(src), threading.Event(), {})
+
+
+def test_new_then_unchanged_then_closed(tmp_path):
+    store = main.StateStore(str(tmp_path / "state.sqlite"))
+    a, b = listing("https://jobs.example/1"), listing("https://jobs.example/2")
+    now = main.UTC_NOW
+
+    rows, closed, counts = store.reconcile([a, b], ["seek"], now)
+    assert counts["new"] == 2 and not closed
+    rows, closed, counts = store.reconcile([a, b], ["seek"], now + timedelta(days=1))
+    assert counts["unchanged"] == 2 and {r["_state"] for r in rows} == {"unchanged"}
+    rows, closed, counts = store.reconcile([a], ["seek"], now + timedelta(days=2))
+    assert counts["closed"] == 1
+    assert closed[0]["Source (with link)"] == "https://jobs.example/2"
+    assert closed[0]["Status (Active/Closed)"] == "Closed"
+    store.close()
+
+
+def test_partial_scan_closes_nothing(tmp_path):
+    store = main.StateStore(str(tmp_path / "state.sqlite"))
+    raws = [{"title": f"Head of Data {i}", "href": f"/job/{i}"} for i in range(3)]
+    rows, partial, _ = scan(FakeSource(raws))
+    for r in rows:
+        r["_source"] = "fake"
+    store.reconcile(rows, ["fake"], main.UTC_NOW)
+
+    rows, notes, _ = scan(FakeSource(raws, max_results=1))
+    assert notes == ["stopped at max_results=1"]
+    for r in rows:
+        r["_source"] = "fake"
+    ok = main.closing_sources({"fake": len(rows)}, {"fake": notes})
+    assert ok == []
+    _, closed, counts = store.reconcile(rows, ok, main.UTC_NOW)
+    assert not closed and counts["closed"] == 0
+    store.close()
+
+
+def test_listing_that_ages_out_is_retired_not_closed(tmp_path):
+    store = main.StateStore(str(tmp_path / "state.sqlite"))
+    raw = {"title": "Head of Data", "href": "/job/1", "posted": main.SINCE + timedelta(days=1)}
+    rows, _, aged = scan(FakeSource([raw]))
+    rows[0]["_source"] = "fake"
+    store.reconcile(rows, ["fake"], main.UTC_NOW)
+
+    raw["posted"] = main.SINCE - timedelta(days=1)  # same posting, a run where it's past the window
+    rows, _, aged = scan(FakeSource([raw]))
+    assert rows == [] and len(aged) == 1
+    _, closed, counts = store.reconcile(rows, ["fake"], main.UTC_NOW, aged)
+    assert closed == [] and counts["expired"] == 1
+    store.close()
+
+
+def test_reused_enriched_row_leaves_the_window(tmp_path):
+    store = main.StateStore(str(tmp_path / "state.sqlite"))
+    details = main.DetailCache(str(tmp_path / "details.sqlite"))
+    url = "https://jobs.example/1"
+    posted = main.UTC_NOW - timedelta(days=5)
+    details.put(url, {"body": "azure banking", "posted": posted.isoformat(), "location": "Sydney", "company": ""})
+
+    now = main.UTC_NOW
+    rows, _, _ = store.reconcile([listing(url)], ["seek"], now)
+    _, enriched = main.enrich_rows(rows, details)
+    store.save_rows(enriched)
+    assert not main.out_of_window(rows[0], now - timedelta(days=7))
+
+    later = now + timedelta(days=10)  # unchanged: the stored, already-enriched row is reused
+    rows, _, counts = store.reconcile([listing(url)], ["seek"], later)
+    assert counts["unchanged"] == 1 and rows[0].get("_enriched")
+    assert main.out_of_window(rows[0], later - timedelta(days=7))
+    details.close()
+    store.close()